@@ -0,0 +1,213 @@
+"""
+Cache des recherches de patients
+Ce module fournit un cache TTL en mémoire pour ne pas refaire pendant un appel les mêmes requêtes Supabase
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from functionCallingServices.supabase_client import supabase
+
+# Everything that is not a digit, removed from phone numbers to build cache keys
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+class AsyncTTLCache:
+    """
+    In-memory cache whose entries expire after a fixed delay
+
+    Misses (None values) are kept for `negative_ttl` seconds only, so a patient registered
+    just after a failed lookup is found again quickly. Meant to be used from the event loop:
+    the methods never await, so no lock is needed around the entries.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float = 0, maxsize: int = 256):
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a key
+
+        Returns:
+            Tuple[bool, Any]: (True, value) on a hit, (False, None) if the key is missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, None values use the negative TTL."""
+        ttl = self._ttl if value is not None else self._negative_ttl
+        if ttl <= 0:
+            return
+        if key not in self._entries and len(self._entries) >= self._maxsize:
+            self._evict()
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._entries.pop(key, None)
+
+    def pop_values(self, predicate: Callable[[Any], bool]) -> None:
+        """Remove every entry whose value matches the predicate."""
+        for key in [k for k, (_, value) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest one if the cache is still full."""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        if len(self._entries) >= self._maxsize:
+            del self._entries[next(iter(self._entries))]
+
+
+# Client rows by ("email", email) and ("phone", digits)
+_client_cache = AsyncTTLCache(ttl=60, negative_ttl=10)
+
+# Pages of list_all_clients by (limit, offset), any write clears them all
+_list_cache = AsyncTTLCache(ttl=30, maxsize=16)
+
+# Caps the number of concurrent lookups sent to Supabase
+_supabase_semaphore = asyncio.Semaphore(10)
+
+# Lookups currently sent to Supabase by cache key, concurrent callers await the same task
+_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+
+def normalize_email(email: str) -> str:
+    """Return the canonical form of an email address used as cache key."""
+    return email.strip().lower()
+
+
+def normalize_phone(phone: str) -> str:
+    """Return the canonical form of a phone number used as cache key (digits only)."""
+    return _NON_DIGIT_RE.sub("", phone)
+
+
+def _remember(client: Dict) -> None:
+    """Cache a client row under both its email and its phone number."""
+    if client.get("email"):
+        _client_cache.set(("email", normalize_email(client["email"])), client)
+    if client.get("phone"):
+        _client_cache.set(("phone", normalize_phone(client["phone"])), client)
+
+
+async def _fetch(key: Tuple[str, str], getter: Callable[[str], Awaitable[Optional[Dict]]], value: str) -> Optional[Dict]:
+    """Run a Supabase lookup and cache its result, a failed lookup raises and is not cached."""
+    async with _supabase_semaphore:
+        client = await getter(value)
+    # A write may have invalidated this lookup while it was in flight, its result is then stale
+    if _inflight.get(key) is asyncio.current_task():
+        _client_cache.set(key, client)
+        if client:
+            _remember(client)
+    return client
+
+
+async def _lookup(key: Tuple[str, str], getter: Callable[[str], Awaitable[Optional[Dict]]], value: str) -> Optional[Dict]:
+    """Return a client from the cache, or from a single Supabase request shared by concurrent callers."""
+    found, client = _client_cache.get(key)
+    if found:
+        return client
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(key, getter, value))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _inflight.pop(key) if _inflight.get(key) is done else None)
+    # Shielded so a cancelled caller does not cancel the lookup of the others
+    return await asyncio.shield(task)
+
+
+async def cached_get_by_email(email: str) -> Optional[Dict]:
+    """
+    Get a client by email address, from the cache when possible
+
+    Args:
+        email: The email address to look up
+
+    Returns:
+        Optional[Dict]: The client row, or None if no client has this email
+
+    Raises:
+        Exception: If the Supabase request failed, a failure is never cached as a missing client
+    """
+    return await _lookup(("email", normalize_email(email)), supabase.get_client_by_email, email)
+
+
+async def cached_get_by_phone(phone: str) -> Optional[Dict]:
+    """
+    Get a client by phone number, from the cache when possible
+
+    Args:
+        phone: The phone number to look up
+
+    Returns:
+        Optional[Dict]: The client row, or None if no client has this phone number
+
+    Raises:
+        Exception: If the Supabase request failed, a failure is never cached as a missing client
+    """
+    return await _lookup(("phone", normalize_phone(phone)), supabase.get_client_by_phone, phone)
+
+
+async def cached_get_clients_page(limit: int, offset: int) -> Tuple[List[Dict], int]:
+    """
+    Get a page of clients and the total number of clients, from the cache when possible
+
+    Args:
+        limit: The number of clients per page
+        offset: The number of clients to skip
+
+    Returns:
+        Tuple[List[Dict], int]: The clients of the page and the total number of clients
+    """
+    key = (limit, offset)
+    found, page = _list_cache.get(key)
+    if found:
+        return page
+
+    page = await supabase.get_clients_page(limit=limit, offset=offset)
+    # Empty pages are not kept, get_clients_page also returns one when the request fails
+    if page[0]:
+        _list_cache.set(key, page)
+    return page
+
+
+def invalidate(email: Optional[str] = None, phone: Optional[str] = None, client_id: Optional[Any] = None) -> None:
+    """
+    Forget the cached lookups affected by a write
+
+    Args:
+        email: An email address whose lookup must be refreshed
+        phone: A phone number whose lookup must be refreshed
+        client_id: The id of a modified client, every cached copy of its row is dropped
+    """
+    keys = []
+    if email:
+        keys.append(("email", normalize_email(email)))
+    if phone:
+        keys.append(("phone", normalize_phone(phone)))
+    for key in keys:
+        _client_cache.pop(key)
+        # Later callers must not join a lookup started before the write
+        _inflight.pop(key, None)
+    if client_id is not None:
+        _client_cache.pop_values(lambda client: client is not None and client.get("id") == client_id)
+    # Every write can shift or change the listed pages
+    _list_cache.clear()
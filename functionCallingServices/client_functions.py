@@ -10,13 +10,113 @@ Ce module fournit des fonctions pour interagir avec Supabase pour la gestion des
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional, Callable
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Any, Optional, Callable, Tuple
 from loguru import logger
-from pipecat.frames.frames import TTSSpeakFrame
+from pipecat.frames.frames import Frame, TTSSpeakFrame
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
 
 from functionCallingServices.supabase_client import supabase
+from functionCallingServices.client_cache import (
+    cached_get_by_email,
+    cached_get_by_phone,
+    cached_get_clients_page,
+    invalidate
+)
+from pipelineServices.prerendered_audio import phrase_audio_frame
+
+# Number of clients returned per list_all_clients call
+CLIENTS_PAGE_SIZE = 10
+
+# Loose shape checks, enough to reject values the LLM misheard before any Supabase request
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_PHONE_RE = re.compile(r"^\+?\d[\d\s().-]{6,}$")
+_PHONE_SEPARATORS_RE = re.compile(r"[\s().-]")
+
+def _norm_email(email: str) -> Optional[str]:
+    """Return the email trimmed and lower-cased, or None if it is malformed."""
+    email = email.strip().lower()
+    return email if _EMAIL_RE.match(email) else None
+
+def _norm_phone(phone: str) -> Optional[str]:
+    """Return the phone number without separators (digits and leading +), or None if it is malformed."""
+    phone = phone.strip()
+    return _PHONE_SEPARATORS_RE.sub("", phone) if _PHONE_RE.match(phone) else None
+
+def _normalize_contact(email: Optional[str], phone: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Normalize the email and phone number given by the LLM
+    
+    Args:
+        email: The email address, if any
+        phone: The phone number, if any
+    
+    Returns:
+        Tuple: (email, phone, error) with the normalized values (None when not given)
+        and an error message when one of them is malformed
+    """
+    norm_email = _norm_email(email) if email else None
+    if email and not norm_email:
+        return None, None, f"L'adresse email {email} n'est pas valide."
+    norm_phone = _norm_phone(phone) if phone else None
+    if phone and not norm_phone:
+        return None, None, f"Le numéro de téléphone {phone} n'est pas valide."
+    return norm_email, norm_phone, None
+
+# update_client argument -> clients column
+_UPDATE_MAP = (
+    ("first_name", "first_name"),
+    ("last_name", "last_name"),
+    ("new_email", "email"),
+    ("phone", "phone"),
+)
+
+# Fixed sentences spoken by the handlers, pre-synthesized at startup (see FILLER_PHRASES)
+_SAY_NEED_CLIENT_INFO = "J'ai besoin de plus d'informations pour ajouter ce patient."
+_SAY_NEED_CONTACT = "J'ai besoin d'un email ou d'un numéro de téléphone pour vérifier si le client existe."
+_SAY_NEED_ID_OR_EMAIL = "J'ai besoin de l'identifiant ou de l'email du patient pour le mettre à jour."
+_SAY_REGISTERING = "Je vous enregistre sur notre base de données, veuillez patienter un instant s'il vous plaît..."
+_SAY_REGISTERING_MANY = "J'enregistre ces patients sur notre base de données, veuillez patienter un instant s'il vous plaît..."
+_SAY_UPDATING = "Je mets à jour les informations du patient..."
+_SAY_LISTING = "Je récupère tous les patients..."
+FILLER_PHRASES = (
+    _SAY_NEED_CLIENT_INFO,
+    _SAY_NEED_CONTACT,
+    _SAY_NEED_ID_OR_EMAIL,
+    _SAY_REGISTERING,
+    _SAY_REGISTERING_MANY,
+    _SAY_UPDATING,
+    _SAY_LISTING,
+)
+
+def _speech_frame(text: str) -> Frame:
+    """Return the pre-synthesized audio of a fixed sentence, or a TTSSpeakFrame for the live TTS."""
+    return phrase_audio_frame(text) or TTSSpeakFrame(text)
+
+@asynccontextmanager
+async def _say(llm: Any, text: str) -> AsyncIterator[None]:
+    """
+    Speak a waiting message while the body runs, without waiting for its frame to be queued first
+
+    The frame is queued before leaving the block, even if the body raises, so the message is
+    always spoken before the answer given to result_callback, error answers included.
+    """
+    tts_task = asyncio.create_task(llm.push_frame(_speech_frame(text)))
+    try:
+        yield
+    finally:
+        await tts_task
+
+# Clients found during this call by normalized email. The process serves a single call, so this is
+# per-session state: add_client answers "already registered" for them without any Supabase request
+_seen_clients: Dict[str, Dict] = {}
+
+def _mark_seen(client: Dict) -> None:
+    """Remember a client found or created during this call."""
+    if client.get("email"):
+        _seen_clients[client["email"].strip().lower()] = client
 
 # Helper function to format client data into a user-friendly string
 def format_client_info(client: Dict) -> str:
@@ -54,24 +154,37 @@ async def add_client(function_name: str, tool_call_id: str, args: Dict[str, Any]
                 "success": False,
                 "error": "Information client incomplète. Veuillez fournir prénom, nom, email et téléphone."
             }
-            await llm.push_frame(TTSSpeakFrame("J'ai besoin de plus d'informations pour ajouter ce patient."))
+            await llm.push_frame(_speech_frame(_SAY_NEED_CLIENT_INFO))
             await result_callback(error_msg)
             return
+
+        email, phone, error = _normalize_contact(email, phone)
+        if error:
+            await result_callback({"success": False, "error": error})
+            return
         
-        # Check if client already exists
-        existing_client = await supabase.get_client_by_email(email)
-        if existing_client:
+        # The caller was already found during this call, no need to ask the database
+        if email in _seen_clients:
+            await result_callback({
+                "success": False,
+                "error": f"Un patient avec l'email {email} existe déjà dans la base de données.",
+                "client": _seen_clients[email]
+            })
+            return
+
+        # Add client to database, the unique email constraint detects existing clients in the same request
+        async with _say(llm, _SAY_REGISTERING):
+            client = await supabase.insert_client(first_name, last_name, email, phone)
+        if not client:
             response = {
                 "success": False,
                 "error": f"Un patient avec l'email {email} existe déjà dans la base de données.",
-                "client": existing_client
+                "client": await cached_get_by_email(email)
             }
             await result_callback(response)
             return
-            
-        # Add client to database
-        await llm.push_frame(TTSSpeakFrame("Je vous enregistre sur notre base de données, veuillez patienter un instant s'il vous plaît..."))
-        client = await supabase.add_client(first_name, last_name, email, phone)
+        invalidate(email=email, phone=phone)
+        _mark_seen(client)
         
         success_response = {
             "success": True,
@@ -81,10 +194,82 @@ async def add_client(function_name: str, tool_call_id: str, args: Dict[str, Any]
         await result_callback(success_response)
     
     except Exception as e:
-        logger.error(f"Error in add_client function: {e}")
+        logger.error("Error in add_client function: {}", e)
         error_response = {
             "success": False,
-            "error": f"Échec de l'ajout du client: {str(e)}"
+            "error": f"Échec de l'ajout du client: {e}"
+        }
+        await result_callback(error_response)
+
+async def bulk_add_clients(function_name: str, tool_call_id: str, args: Dict[str, Any], 
+                           llm: Any, context: Any, result_callback: Callable) -> None:
+    """
+    Add several clients to the database in a single request (a whole family for example)
+    
+    Args:
+        function_name: The name of the function being called
+        tool_call_id: The ID of the tool call
+        args: Arguments containing the list of clients
+        llm: The LLM service instance
+        context: The context object
+        result_callback: Callback to send results back to the LLM
+    """
+    try:
+        clients = args.get("clients") or []
+        if not clients:
+            await result_callback({
+                "success": False,
+                "error": "Veuillez fournir au moins un patient à ajouter."
+            })
+            return
+
+        # Validate every client first, only the valid ones are sent to Supabase
+        results = []
+        rows = []
+        batch_emails = set()
+        for client in clients:
+            first_name = client.get("first_name")
+            last_name = client.get("last_name")
+            email, phone, error = _normalize_contact(client.get("email"), client.get("phone"))
+            if not all([first_name, last_name, client.get("email"), client.get("phone")]):
+                error = "Information client incomplète. Veuillez fournir prénom, nom, email et téléphone."
+            if error:
+                results.append({"email": client.get("email"), "status": "invalid", "error": error})
+                continue
+            # The insert keeps a single row per email, the repeats of the batch are reported as existing
+            if email in batch_emails:
+                results.append({"email": email, "status": "already_exists"})
+                continue
+            batch_emails.add(email)
+            rows.append({"first_name": first_name, "last_name": last_name, "email": email, "phone": phone})
+
+        created = []
+        if rows:
+            async with _say(llm, _SAY_REGISTERING_MANY):
+                created = await supabase.bulk_insert_clients(rows)
+
+        created_by_email = {client["email"]: client for client in created}
+        for row in rows:
+            client = created_by_email.get(row["email"])
+            if client:
+                invalidate(email=row["email"], phone=row["phone"])
+                _mark_seen(client)
+                results.append({"email": row["email"], "status": "created", "client": client})
+            else:
+                results.append({"email": row["email"], "status": "already_exists"})
+
+        await result_callback({
+            "success": bool(created),
+            "created": len(created),
+            "results": results,
+            "message": f"{len(created)} patient(s) ajouté(s) sur {len(clients)}."
+        })
+    
+    except Exception as e:
+        logger.error("Error in bulk_add_clients function: {}", e)
+        error_response = {
+            "success": False,
+            "error": f"Échec de l'ajout des patients: {e}"
         }
         await result_callback(error_response)
 
@@ -110,19 +295,41 @@ async def verify_client(function_name: str, tool_call_id: str, args: Dict[str, A
                 "exists": False,
                 "error": "Veuillez fournir un email ou un numéro de téléphone pour vérifier le client."
             }
-            await llm.push_frame(TTSSpeakFrame("J'ai besoin d'un email ou d'un numéro de téléphone pour vérifier si le client existe."))
+            await llm.push_frame(_speech_frame(_SAY_NEED_CONTACT))
             await result_callback(error_msg)
             return
+
+        email, phone, error = _normalize_contact(email, phone)
+        if error:
+            await result_callback({"exists": False, "error": error})
+            return
         
-        client = None
+        lookups = []
         if email:
-            await llm.push_frame(TTSSpeakFrame(f"Je vérifie si un patient enregistré avec l'email {email} existe, veuillez patienter un instant s'il vous plaît......"))
-            client = await supabase.get_client_by_email(email)
-        elif phone:
-            await llm.push_frame(TTSSpeakFrame(f"Je vérifie si un patient enregistré avec le numéro {phone} existe, veuillez patienter un instant s'il vous plaît......"))
-            client = await supabase.get_client_by_phone(phone)
+            waiting_message = f"Je vérifie si un patient enregistré avec l'email {email} existe, veuillez patienter un instant s'il vous plaît......"
+            lookups.append(cached_get_by_email(email))
+        else:
+            waiting_message = f"Je vérifie si un patient enregistré avec le numéro {args.get('phone')} existe, veuillez patienter un instant s'il vous plaît......"
+        if phone:
+            lookups.append(cached_get_by_phone(phone))
+
+        # Email and phone are looked up concurrently, the first client found wins
+        async with _say(llm, waiting_message):
+            results = await asyncio.gather(*lookups, return_exceptions=True)
+        client = None
+        failures = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Client lookup failed in verify_client: {}", result)
+                failures.append(result)
+            elif result and client is None:
+                client = result
+        # Not found only means something if no lookup failed, otherwise the patient may well exist
+        if client is None and failures:
+            raise failures[0]
         
         if client:
+            _mark_seen(client)
             response = {
                 "exists": True,
                 "client": client,
@@ -138,10 +345,10 @@ async def verify_client(function_name: str, tool_call_id: str, args: Dict[str, A
             await result_callback(not_found_msg)
     
     except Exception as e:
-        logger.error(f"Error in verify_client function: {e}")
+        logger.error("Error in verify_client function: {}", e)
         error_response = {
             "exists": False,
-            "error": f"Erreur lors de la vérification du client: {str(e)}"
+            "error": f"Erreur lors de la vérification du client: {e}"
         }
         await result_callback(error_response)
 
@@ -168,33 +375,19 @@ async def update_client(function_name: str, tool_call_id: str, args: Dict[str, A
                 "success": False,
                 "error": "Veuillez fournir l'ID client ou l'email pour mettre à jour les informations."
             }
-            await llm.push_frame(TTSSpeakFrame("J'ai besoin de l'identifiant ou de l'email du patient pour le mettre à jour."))
+            await llm.push_frame(_speech_frame(_SAY_NEED_ID_OR_EMAIL))
             await result_callback(error_msg)
             return
+
+        email, phone, error = _normalize_contact(email, args.get("phone"))
+        new_email, _, new_email_error = _normalize_contact(args.get("new_email"), None)
+        if error or new_email_error:
+            await result_callback({"success": False, "error": error or new_email_error})
+            return
         
-        # If email is provided but not client_id, find the client first
-        if not client_id and email:
-            client = await supabase.get_client_by_email(email)
-            if client:
-                client_id = client["id"]
-            else:
-                error_msg = {
-                    "success": False,
-                    "error": f"Aucun patient trouvé avec l'email {email}."
-                }
-                await result_callback(error_msg)
-                return
-        
-        # Extract fields to update
-        update_data = {}
-        if args.get("first_name"):
-            update_data["first_name"] = args.get("first_name")
-        if args.get("last_name"):
-            update_data["last_name"] = args.get("last_name")
-        if args.get("new_email"):
-            update_data["email"] = args.get("new_email")
-        if args.get("phone"):
-            update_data["phone"] = args.get("phone")
+        # Extract fields to update, with the normalized contact details instead of the raw ones
+        values = {**args, "new_email": new_email, "phone": phone}
+        update_data = {column: value for arg, column in _UPDATE_MAP if (value := values.get(arg))}
             
         if not update_data:
             error_msg = {
@@ -204,9 +397,24 @@ async def update_client(function_name: str, tool_call_id: str, args: Dict[str, A
             await result_callback(error_msg)
             return
             
-        # Update client in database
-        await llm.push_frame(TTSSpeakFrame("Je mets à jour les informations du patient..."))
-        updated_client = await supabase.update_client(client_id, update_data)
+        # Update client in database, by email directly when no client_id is given
+        async with _say(llm, _SAY_UPDATING):
+            if client_id:
+                updated_client = await supabase.update_client(client_id, update_data)
+            else:
+                updated_client = await supabase.update_client_by_email(email, update_data)
+        if not updated_client:
+            error_msg = {
+                "success": False,
+                "error": f"Aucun patient trouvé avec l'email {email}."
+            }
+            await result_callback(error_msg)
+            return
+        invalidate(email=update_data.get("email"), phone=update_data.get("phone"), client_id=updated_client["id"])
+        # The email may have changed, forget the client under its previous one
+        for seen_email in [e for e, c in _seen_clients.items() if c.get("id") == updated_client["id"]]:
+            del _seen_clients[seen_email]
+        _mark_seen(updated_client)
         
         success_response = {
             "success": True,
@@ -216,10 +424,10 @@ async def update_client(function_name: str, tool_call_id: str, args: Dict[str, A
         await result_callback(success_response)
     
     except Exception as e:
-        logger.error(f"Error in update_client function: {e}")
+        logger.error("Error in update_client function: {}", e)
         error_response = {
             "success": False,
-            "error": f"Échec de la mise à jour du patient: {str(e)}"
+            "error": f"Échec de la mise à jour du patient: {e}"
         }
         await result_callback(error_response)
 
@@ -247,11 +455,17 @@ async def find_client_by_email(function_name: str, tool_call_id: str, args: Dict
             #await llm.push_frame(TTSSpeakFrame("J'ai besoin d'une adresse email pour trouver le patient."))
             await result_callback(error_msg)
             return
+
+        email, _, error = _normalize_contact(email, None)
+        if error:
+            await result_callback({"found": False, "error": error})
+            return
         
-        await llm.push_frame(TTSSpeakFrame(f"Je recherche un patient enregistré avec l'email {email},veuillez patienter un instant s'il vous plaît......"))
-        client = await supabase.get_client_by_email(email)
+        async with _say(llm, f"Je recherche un patient enregistré avec l'email {email},veuillez patienter un instant s'il vous plaît......"):
+            client = await cached_get_by_email(email)
         
         if client:
+            _mark_seen(client)
             response = {
                 "found": True,
                 "client": client
@@ -265,10 +479,10 @@ async def find_client_by_email(function_name: str, tool_call_id: str, args: Dict
             await result_callback(not_found_msg)
     
     except Exception as e:
-        logger.error(f"Error in find_client_by_email function: {e}")
+        logger.error("Error in find_client_by_email function: {}", e)
         error_response = {
             "found": False,
-            "error": f"Erreur lors de la recherche du patient: {str(e)}"
+            "error": f"Erreur lors de la recherche du patient: {e}"
         }
         await result_callback(error_response)
 
@@ -296,9 +510,14 @@ async def find_client_by_phone(function_name: str, tool_call_id: str, args: Dict
            # await llm.push_frame(TTSSpeakFrame("J'ai besoin d'un numéro de téléphone pour trouver le patient."))
             await result_callback(error_msg)
             return
+
+        _, normalized_phone, error = _normalize_contact(None, phone)
+        if error:
+            await result_callback({"found": False, "error": error})
+            return
         
-        await llm.push_frame(TTSSpeakFrame(f"Je recherche un patient enregistré avec le numéro {phone}, veuillez patienter un instant s'il vous plaît..."))
-        client = await supabase.get_client_by_phone(phone)
+        async with _say(llm, f"Je recherche un patient enregistré avec le numéro {phone}, veuillez patienter un instant s'il vous plaît..."):
+            client = await cached_get_by_phone(normalized_phone)
         
         if client:
             response = {
@@ -314,61 +533,74 @@ async def find_client_by_phone(function_name: str, tool_call_id: str, args: Dict
             await result_callback(not_found_msg)
     
     except Exception as e:
-        logger.error(f"Error in find_client_by_phone function: {e}")
+        logger.error("Error in find_client_by_phone function: {}", e)
         error_response = {
             "found": False,
-            "error": f"Erreur lors de la recherche du client: {str(e)}"
+            "error": f"Erreur lors de la recherche du client: {e}"
         }
         await result_callback(error_response)
 
 async def list_all_clients(function_name: str, tool_call_id: str, args: Dict[str, Any], 
                         llm: Any, context: Any, result_callback: Callable) -> None:
     """
-    List all clients in the database
+    List the clients in the database, one page at a time
     
     Args:
         function_name: The name of the function being called
         tool_call_id: The ID of the tool call
-        args: Empty argument dict
+        args: Arguments containing the optional page number (starting at 1)
         llm: The LLM service instance
         context: The context object
         result_callback: Callback to send results back to the LLM
     """
     try:
-        await llm.push_frame(TTSSpeakFrame("Je récupère tous les patients..."))
-        clients = await supabase.get_clients()
+        page = max(int(args.get("page") or 1), 1)
+        offset = (page - 1) * CLIENTS_PAGE_SIZE
+
+        async with _say(llm, _SAY_LISTING):
+            clients, total = await cached_get_clients_page(limit=CLIENTS_PAGE_SIZE, offset=offset)
         
         if not clients:
             await result_callback({
-                "count": 0,
+                "count": total,
+                "page": page,
                 "clients": [],
-                "message": "Aucun patient trouvé dans la base de données."
+                "message": "Aucun patient trouvé dans la base de données." if not total
+                           else f"La page {page} est vide, il y a {total} patients dans la base de données."
             })
             return
         
         response = {
-            "count": len(clients),
-            "clients": clients,
-            "message": f"Trouvé {len(clients)} patients dans la base de données."
+            "count": total,
+            "page": page,
+            # Only what is needed to tell patients apart, find_client_by_email gives the details
+            "clients": [
+                {"id": c["id"], "name": f"{c['first_name']} {c['last_name']}", "email": c["email"]}
+                for c in clients
+            ],
+            "message": f"Trouvé {total} patients dans la base de données, affichage des patients {offset + 1} à {offset + len(clients)}. "
+                       "Utilisez find_client_by_email pour les détails d'un patient."
         }
+        if offset + len(clients) < total:
+            response["next_page"] = page + 1
         
         await result_callback(response)
     
     except Exception as e:
-        logger.error(f"Error in list_all_clients function: {e}")
+        logger.error("Error in list_all_clients function: {}", e)
         error_response = {
             "count": 0,
             "clients": [],
-            "error": f"Erreur lors de la récupération des clients: {str(e)}"
+            "error": f"Erreur lors de la récupération des clients: {e}"
         }
         await result_callback(error_response)
 
-def get_client_function_schemas() -> List[FunctionSchema]:
+def _build_client_function_schemas() -> Tuple[FunctionSchema, ...]:
     """
-    Get the list of function schemas for client database operations
+    Build the function schemas for client database operations
     
     Returns:
-        List[FunctionSchema]: List of function schemas for client database operations
+        Tuple[FunctionSchema, ...]: Function schemas for client database operations
     """
     add_client_function = FunctionSchema(
         name="add_client",
@@ -394,6 +626,30 @@ def get_client_function_schemas() -> List[FunctionSchema]:
         required=["first_name", "last_name", "email", "phone"],
     )
     
+    bulk_add_clients_function = FunctionSchema(
+        name="bulk_add_clients",
+        description="Ajouter plusieurs nouveaux patients à la base de données en une seule fois (par exemple une famille)",
+        properties={
+            "clients": {
+                "type": "array",
+                "description": "Les patients à ajouter, 5 au plus par appel",
+                # Bounds the size of the generated arguments, they must fit in the LLM max_tokens
+                "maxItems": 5,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "first_name": {"type": "string", "description": "Le prénom du patient"},
+                        "last_name": {"type": "string", "description": "Le nom de famille du patient"},
+                        "email": {"type": "string", "description": "L'adresse email du patient"},
+                        "phone": {"type": "string", "description": "Le numéro de téléphone du patient"},
+                    },
+                    "required": ["first_name", "last_name", "email", "phone"],
+                },
+            },
+        },
+        required=["clients"],
+    )
+    
     verify_client_function = FunctionSchema(
         name="verify_client",
         description="Vérifier si un client existe dans la base de données par email ou téléphone",
@@ -468,19 +724,51 @@ def get_client_function_schemas() -> List[FunctionSchema]:
     
     list_all_clients_function = FunctionSchema(
         name="list_all_clients",
-        description="Lister tous les patients dans la base de données",
-        properties={},
+        description=f"Lister les patients de la base de données, par pages de {CLIENTS_PAGE_SIZE}",
+        properties={
+            "page": {
+                "type": "integer",
+                "description": "Le numéro de la page à afficher, à partir de 1 (1 par défaut)",
+            },
+        },
         required=[],
     )
     
-    return [
+    return (
         add_client_function,
+        bulk_add_clients_function,
         verify_client_function,
         update_client_function,
         find_client_by_email_function,
         find_client_by_phone_function,
         list_all_clients_function
-    ]
+    )
+
+# The schemas never change, they are built once at import
+_CLIENT_FUNCTION_SCHEMAS = _build_client_function_schemas()
+_SCHEMAS_BY_NAME = {schema.name: schema for schema in _CLIENT_FUNCTION_SCHEMAS}
+
+# Handler of each client function, in the same order as the schemas
+_HANDLERS = (
+    ("add_client", add_client),
+    ("bulk_add_clients", bulk_add_clients),
+    ("verify_client", verify_client),
+    ("update_client", update_client),
+    ("find_client_by_email", find_client_by_email),
+    ("find_client_by_phone", find_client_by_phone),
+    ("list_all_clients", list_all_clients),
+)
+# Every handler must have a schema and the other way round
+assert _SCHEMAS_BY_NAME.keys() == {name for name, _ in _HANDLERS}
+
+def get_client_function_schemas() -> Tuple[FunctionSchema, ...]:
+    """
+    Get the function schemas for client database operations
+    
+    Returns:
+        Tuple[FunctionSchema, ...]: Function schemas for client database operations
+    """
+    return _CLIENT_FUNCTION_SCHEMAS
 
 def register_client_functions(llm_service: Any) -> None:
     """
@@ -489,9 +777,5 @@ def register_client_functions(llm_service: Any) -> None:
     Args:
         llm_service: The LLM service to register the functions with
     """
-    llm_service.register_function("add_client", add_client)
-    llm_service.register_function("verify_client", verify_client)
-    llm_service.register_function("update_client", update_client)
-    llm_service.register_function("find_client_by_email", find_client_by_email)
-    llm_service.register_function("find_client_by_phone", find_client_by_phone)
-    llm_service.register_function("list_all_clients", list_all_clients) 
\ No newline at end of file
+    for name, handler in _HANDLERS:
+        llm_service.register_function(name, handler) 
\ No newline at end of file
@@ -4,25 +4,24 @@ Ce module fournit des fonctions pour interagir avec l'API Google Calendar pour l
 """
 
 import os
+import re
+import atexit
 import datetime
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple, TypeVar
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo
 from dateutil import parser
-import pytz
-import locale
-
-# Set French locale for date formatting
-try:
-    locale.setlocale(locale.LC_TIME, 'fr_FR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_TIME, 'fr_FR')
-    except:
-        pass  # Fallback to system locale if French is not available
+from loguru import logger
 
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 from googleapiclient.discovery import build
 import pickle
 
@@ -30,38 +29,362 @@ from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
 from pipecat.frames.frames import TTSSpeakFrame
 
-# If modifying these scopes, delete the token.pickle file
+# If modifying these scopes, delete the token.json file
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 # Set Paris timezone as default
 TIMEZONE = 'Europe/Paris'
-TIMEZONE_PYTZ = pytz.timezone(TIMEZONE)
+TIMEZONE_INFO = ZoneInfo(TIMEZONE)
+
+# The Google API client is synchronous (httplib2): its calls run on a small dedicated pool
+# so they never block the event loop, while bounding the number of open sockets
+_GOOGLE_API_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="google-calendar")
+
+def _slot_label(hour: int, minute: int) -> str:
+    """Label of a slot in French, like 09h or 14h30"""
+    return f"{hour:02d}h{minute:02d}" if minute else f"{hour:02d}h"
+
+# Bookable 30-minute slots of a working day (9h to 17h), labelled like "09h" and "09h30"
+_ALL_SLOTS = tuple(_slot_label(h, m) for h in range(9, 17) for m in (0, 30))
+# Start and end times of the slots as spoken in the availability ranges, from "9h" to "17h"
+_SLOT_BOUNDARIES = tuple(f"{9 + i // 2}h30" if i % 2 else f"{9 + i // 2}h" for i in range(len(_ALL_SLOTS) + 1))
+
+def _merge_slots(available_slots: Iterable[str]) -> List[str]:
+    """
+    Merge consecutive free slots into the ranges the assistant reads out
+    
+    The ranges are returned ready to speak, so the LLM neither receives the 16 slot labels
+    nor has to group them itself.
+    
+    Args:
+        available_slots: Labels of the free slots, like "09h" or "14h30"
+        
+    Returns:
+        List[str]: The free ranges, like ["de 9h à 10h30", "de 14h à 17h"]
+    """
+    free = set(available_slots)
+    ranges = []
+    start = None
+    for i, slot in enumerate(_ALL_SLOTS):
+        if slot in free:
+            if start is None:
+                start = i
+        elif start is not None:
+            ranges.append(f"de {_SLOT_BOUNDARIES[start]} à {_SLOT_BOUNDARIES[i]}")
+            start = None
+    if start is not None:
+        ranges.append(f"de {_SLOT_BOUNDARIES[start]} à {_SLOT_BOUNDARIES[-1]}")
+    return ranges
+
+# Relative date references in French and their offset in days from today
+_RELATIVE_OFFSETS = {
+    "aujourd'hui": 0, "aujourd’hui": 0, 'ce jour': 0,
+    'demain': 1,
+    'après-demain': 2, 'apres-demain': 2, 'après demain': 2, 'apres demain': 2,
+    'semaine prochaine': 7, 'la semaine prochaine': 7, 'dans une semaine': 7,
+}
+
+# French weekday names, indexed like date.weekday()
+_DAYS_OF_WEEK = ('lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche')
+_DAY_OFFSETS = {day: weekday for weekday, day in enumerate(_DAYS_OF_WEEK)}
+# A weekday name and the 'prochain(e)' qualifier, each found in a single scan of the string
+_DAY_RE = re.compile(r'\b(' + '|'.join(_DAYS_OF_WEEK) + r')\b')
+_NEXT_RE = re.compile(r'\bprochain')
+
+# Absolute dates in the JJ/MM/AAAA form, also accepted with dashes or a two-digit year
+_DDMMYYYY_RE = re.compile(r'^\s*(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})\s*$')
+
+# Only the fields read by the handlers are requested, to keep the API responses small
+_EVENT_FIELDS = 'items(id,summary,start/dateTime)'
+_CALENDAR_LIST_FIELDS = 'items(id,summary,description,primary,accessRole,backgroundColor,timeZone)'
+
+T = TypeVar("T")
+
+async def _run(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking call (service construction, Google API request) in the Google API thread pool
+    
+    Args:
+        fn: The blocking callable
+        *args, **kwargs: Arguments passed to fn
+        
+    Returns:
+        The result of fn
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_GOOGLE_API_EXECUTOR, functools.partial(fn, *args, **kwargs))
+
+# httplib2 connections are not thread-safe: each thread of the API pool keeps its own
+# authorized connection, reused (keep-alive) by all the requests it executes
+_THREAD_HTTP = threading.local()
+
+def _thread_http() -> AuthorizedHttp:
+    """Return the authorized HTTP connection of the current thread, for the current credentials"""
+    http = getattr(_THREAD_HTTP, 'http', None)
+    if http is None or http.credentials is not _CREDS:
+        http = AuthorizedHttp(_CREDS, http=httplib2.Http(timeout=10))
+        _THREAD_HTTP.http = http
+    return http
+
+def _execute_blocking(request: Any) -> Any:
+    """Execute a Google API request (or batch) on the connection of the current thread"""
+    return request.execute(http=_thread_http())
+
+async def _execute(request: Any) -> Any:
+    """
+    Execute a Google API request (or batch) in the Google API thread pool
+    
+    Args:
+        request: An HttpRequest or BatchHttpRequest built from the calendar service
+        
+    Returns:
+        The decoded response of the request
+    """
+    return await _run(_execute_blocking, request)
+
+# Calendar service shared by every handler, built once and rebuilt only when the credentials expire
+_SERVICE = None
+_CREDS = None
+_SERVICE_LOCK = threading.Lock()
+# The file token.json stores the user's access and refresh tokens, token.pickle is the legacy format
+TOKEN_FILE = 'token.json'
+LEGACY_TOKEN_FILE = 'token.pickle'
+# Access token as last written to token.json, the file is only rewritten when it changes
+_SAVED_TOKEN = None
+
+def _save_credentials(creds) -> None:
+    """Write the credentials to token.json"""
+    global _SAVED_TOKEN
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+    _SAVED_TOKEN = creds.token
+
+def _load_credentials() -> Optional[Credentials]:
+    """Read the saved credentials, migrating a legacy token.pickle to token.json once"""
+    global _SAVED_TOKEN
+    if os.path.exists(TOKEN_FILE):
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        _SAVED_TOKEN = creds.token
+        return creds
+    if os.path.exists(LEGACY_TOKEN_FILE):
+        with open(LEGACY_TOKEN_FILE, 'rb') as token:
+            creds = pickle.load(token)
+        _save_credentials(creds)
+        return creds
+    return None
 
 def get_calendar_service():
     """
     Get an authorized Google Calendar service
     Returns a Calendar service object with appropriate credentials
+    
+    The service is built once per process: building it parses the whole discovery document.
+    Expired credentials are refreshed in place, the service keeps using them.
     """
-    creds = None
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-            
-    # If there are no valid credentials available, let the user log in
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
+    global _SERVICE, _CREDS
+    if _SERVICE is not None and _CREDS.valid:
+        return _SERVICE
+
+    with _SERVICE_LOCK:
+        creds = _CREDS if _CREDS is not None else _load_credentials()
+                
+        # If there are no valid credentials available, let the user log in
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+                if creds.token != _SAVED_TOKEN:
+                    _save_credentials(creds)
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    'credentials.json', SCOPES)
+                creds = flow.run_local_server(port=0)
+                # Save the credentials for the next run
+                _save_credentials(creds)
+
+        if _SERVICE is None or creds is not _CREDS:
+            # Requests are executed with the connection of their thread, see _execute
+            _SERVICE = build('calendar', 'v3', http=AuthorizedHttp(creds, http=httplib2.Http(timeout=10)),
+                             cache_discovery=False, static_discovery=True)
+            _CREDS = creds
+        return _SERVICE
+
+@atexit.register
+def _save_refreshed_credentials() -> None:
+    """Save the credentials at exit if they were refreshed during the process"""
+    if _CREDS is not None and _CREDS.token != _SAVED_TOKEN:
+        try:
+            _save_credentials(_CREDS)
+        except OSError:
+            pass
+
+# Calendar list of the account, shared by list_calendars, the doctor lookups and the calendar names
+_CALENDAR_LIST_CACHE: Dict[str, Any] = {'ts': None, 'items': [], 'by_id': {}}
+_CALENDAR_LIST_TTL = 600  # seconds
 
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+# Names of the calendars missing from the calendar list, with the time they were fetched
+_CAL_NAME_CACHE: Dict[str, Tuple[float, str]] = {}
+_CAL_NAME_TTL = 3600  # seconds, calendars are very rarely renamed
+
+async def _load_calendar_list(service: Any) -> List[Dict]:
+    """
+    Get the calendars of the account, from the cache when possible
+    
+    Args:
+        service: The Google Calendar service
+        
+    Returns:
+        List[Dict]: The calendarList entries
+    """
+    now = time.monotonic()
+    if _CALENDAR_LIST_CACHE['ts'] is not None and now - _CALENDAR_LIST_CACHE['ts'] < _CALENDAR_LIST_TTL:
+        return _CALENDAR_LIST_CACHE['items']
+    calendar_list = await _execute(service.calendarList().list(fields=_CALENDAR_LIST_FIELDS))
+    items = calendar_list.get('items', [])
+    _CALENDAR_LIST_CACHE.update(
+        ts=now,
+        items=items,
+        by_id={calendar['id']: calendar.get('summary') for calendar in items},
+    )
+    return items
+
+async def _get_calendar_name(service: Any, calendar_id: str, default: str) -> str:
+    """
+    Get the name (summary) of a calendar, from the calendar list or the cache when possible
+    
+    Args:
+        service: The Google Calendar service
+        calendar_id: The calendar to name
+        default: The name returned if the calendar has no summary
+        
+    Returns:
+        str: The calendar name
+    """
+    await _load_calendar_list(service)
+    if calendar_id in _CALENDAR_LIST_CACHE['by_id']:
+        return _CALENDAR_LIST_CACHE['by_id'][calendar_id] or default
+
+    # Calendars not in the list (e.g. 'primary' or a calendar shared by id only)
+    now = time.monotonic()
+    hit = _CAL_NAME_CACHE.get(calendar_id)
+    if hit and now - hit[0] < _CAL_NAME_TTL:
+        return hit[1]
+    calendar_info = await _execute(service.calendars().get(calendarId=calendar_id, fields='summary'))
+    name = calendar_info.get('summary', default)
+    _CAL_NAME_CACHE[calendar_id] = (now, name)
+    return name
+
+def _event_slot(event: Dict) -> Optional[str]:
+    """
+    Get the slot label of an event's start in Paris time
+    
+    Args:
+        event: An event resource returned by events().list
+        
+    Returns:
+        Optional[str]: The slot label, or None for an all-day event
+    """
+    start = event['start'].get('dateTime')
+    if not start:
+        return None
+    # fromisoformat reads the trailing 'Z' itself since Python 3.11
+    start_time = datetime.datetime.fromisoformat(start).astimezone(TIMEZONE_INFO)
+    return _slot_label(start_time.hour, start_time.minute)
+
+# Events of a day by (calendar_id, date ordinal), with the time they were fetched
+_DAY_EVENTS_CACHE: Dict[Tuple[str, int], Tuple[float, List[Dict]]] = {}
+_DAY_EVENTS_TTL = 30  # seconds, the same day is often checked several times in a row during a call
+# Bumped by every write to a calendar, a list fetched across a write is not cached
+_DAY_EVENTS_GENERATION: Dict[str, int] = {}
+
+async def _list_day_events(service: Any, calendar_id: str, date: datetime.date, fresh: bool = False) -> List[Dict]:
+    """
+    Get the events of a calendar for a day, from the cache when fetched less than 30 seconds ago
+    
+    The cache only knows the writes of this process (one per call): the checks made before
+    a write (booking, cancellation) must read the calendar itself with fresh=True.
+    
+    Args:
+        service: The Google Calendar service
+        calendar_id: The calendar to read
+        date: The day to read
+        fresh: Skip the cache and read the calendar, the result still refreshes the cache
+        
+    Returns:
+        List[Dict]: The events of the day, ordered by start time
+    """
+    key = (calendar_id, date.toordinal())
+    now = time.monotonic()
+    hit = _DAY_EVENTS_CACHE.get(key)
+    if not fresh and hit and now - hit[0] < _DAY_EVENTS_TTL:
+        return hit[1]
+
+    generation = _DAY_EVENTS_GENERATION.get(calendar_id, 0)
+    time_min, time_max = _day_bounds(date.toordinal())
+    events_result = await _execute(service.events().list(
+        calendarId=calendar_id,
+        timeMin=time_min,
+        timeMax=time_max,
+        singleEvents=True,
+        orderBy='startTime',
+        fields=_EVENT_FIELDS
+    ))
+    events = events_result.get('items', [])
+    if _DAY_EVENTS_GENERATION.get(calendar_id, 0) == generation:
+        _DAY_EVENTS_CACHE[key] = (now, events)
+    return events
+
+def _invalidate_day_events(calendar_id: str, date: Optional[datetime.date] = None) -> None:
+    """
+    Forget the cached events of a calendar after a write
+    
+    Args:
+        calendar_id: The modified calendar
+        date: The modified day, every cached day of the calendar is dropped if not provided
+    """
+    _DAY_EVENTS_GENERATION[calendar_id] = _DAY_EVENTS_GENERATION.get(calendar_id, 0) + 1
+    if date is not None:
+        _DAY_EVENTS_CACHE.pop((calendar_id, date.toordinal()), None)
+    else:
+        for key in [key for key in _DAY_EVENTS_CACHE if key[0] == calendar_id]:
+            del _DAY_EVENTS_CACHE[key]
+
+@functools.lru_cache(maxsize=64)
+def _day_bounds(date_ordinal: int) -> Tuple[str, str]:
+    """
+    Get the bounds of a day in Paris time, as the timeMin and timeMax of an events query
+    
+    Args:
+        date_ordinal: The day, as returned by date.toordinal()
+        
+    Returns:
+        Tuple[str, str]: The ISO start of the day and the ISO start of the next day
+    """
+    date = datetime.date.fromordinal(date_ordinal)
+    start_of_day = datetime.datetime(date.year, date.month, date.day, tzinfo=TIMEZONE_INFO)
+    # Built separately so a DST change during the day gets the offset of the next day
+    end_of_day = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time.min, tzinfo=TIMEZONE_INFO)
+    return start_of_day.isoformat(), end_of_day.isoformat()
+
+# French day and month names, so the dates do not depend on the system locale
+_FR_DAYS = tuple(day.capitalize() for day in _DAYS_OF_WEEK)
+_FR_MONTHS = (
+    "janvier", "février", "mars", "avril", "mai", "juin",
+    "juillet", "août", "septembre", "octobre", "novembre", "décembre",
+)
+
+def format_french_date(date: datetime.date, with_year: bool = True) -> str:
+    """
+    Format a date in French, like "Lundi 20 janvier 2023"
+    
+    Args:
+        date: The date (or datetime) to format
+        with_year: Whether the year is included
+        
+    Returns:
+        str: The formatted date
+    """
+    formatted = f"{_FR_DAYS[date.weekday()]} {date.day} {_FR_MONTHS[date.month - 1]}"
+    return f"{formatted} {date.year}" if with_year else formatted
 
 def get_current_time():
     """
@@ -70,48 +393,68 @@ def get_current_time():
     Returns:
         datetime: Current datetime in Paris timezone
     """
-    return datetime.datetime.now(TIMEZONE_PYTZ)
+    return datetime.datetime.now(TIMEZONE_INFO)
+
+def get_current_date_strings() -> Tuple[str, str]:
+    """
+    Get the current date and time in Paris, formatted for the prompt
+    
+    Returns:
+        Tuple[str, str]: The date like "Lundi 20 janvier 2023" and the time like "14:05"
+    """
+    now = get_current_time()
+    return _format_date_and_time(now.toordinal(), now.hour, now.minute)
+
+@functools.lru_cache(maxsize=4)
+def _format_date_and_time(date_ordinal: int, hour: int, minute: int) -> Tuple[str, str]:
+    """Format a day and a minute, cached so the sessions starting within the same minute share the strings"""
+    return format_french_date(datetime.date.fromordinal(date_ordinal)), f"{hour:02d}:{minute:02d}"
 
-def parse_relative_date(date_str: str) -> datetime.date:
+def parse_relative_date(date_str: str, today: Optional[datetime.date] = None) -> datetime.date:
     """
     Parse a relative date reference in French like 'aujourd'hui', 'demain', 'lundi', etc.
     
     Args:
         date_str: String representing a date, either absolute or relative (in French)
+        today: The current date in Paris, computed if not provided
         
     Returns:
         date: The parsed date object
     """
-    date_str = date_str.lower()
-    now = get_current_time()
-    today = now.date()
+    if today is None:
+        today = get_current_time().date()
+    return _parse_relative_date_cached(date_str.lower(), today.toordinal())
+
+@functools.lru_cache(maxsize=512)
+def _parse_relative_date_cached(date_str: str, today_ordinal: int) -> datetime.date:
+    """
+    Parse a lowercased date reference relative to a given day
+    
+    Cached on (date_str, today_ordinal): the same sentence asked again the same day is not parsed again.
+    """
+    today = datetime.date.fromordinal(today_ordinal)
     
     # Handle common relative date references in French
-    if date_str in ['aujourd\'hui', "aujourd'hui", 'ce jour']:
-        return today
-    elif date_str in ['demain']:
-        return today + datetime.timedelta(days=1)
-    elif date_str in ['après-demain', 'apres-demain', 'après demain', 'apres demain']:
-        return today + datetime.timedelta(days=2)
-    elif date_str in ['semaine prochaine', 'la semaine prochaine', 'dans une semaine']:
-        return today + datetime.timedelta(days=7)
+    offset = _RELATIVE_OFFSETS.get(date_str)
+    if offset is not None:
+        return today + datetime.timedelta(days=offset)
     
     # Handle day of week references in French
-    days_of_week = {
-        'lundi': 0, 'mardi': 1, 'mercredi': 2, 'jeudi': 3,
-        'vendredi': 4, 'samedi': 5, 'dimanche': 6
-    }
-    
-    for day, offset in days_of_week.items():
-        if day in date_str:
-            # Get the number of days until the next occurrence of that day
-            days_ahead = offset - today.weekday()
-            if days_ahead <= 0 or 'prochain' in date_str:  # If today's the day or already passed, use next week
-                days_ahead += 7
-            return today + datetime.timedelta(days=days_ahead)
+    match = _DAY_RE.search(date_str)
+    if match:
+        # Get the number of days until the next occurrence of that day
+        days_ahead = _DAY_OFFSETS[match.group(1)] - today.weekday()
+        if days_ahead <= 0 or _NEXT_RE.search(date_str):  # If today's the day or already passed, use next week
+            days_ahead += 7
+        return today + datetime.timedelta(days=days_ahead)
     
     # Try to parse as a normal date
     try:
+        # Fast path for the usual JJ/MM/AAAA (or JJ-MM-AA) form, dateutil only for other formats
+        match = _DDMMYYYY_RE.match(date_str)
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+            return datetime.date(year if year > 99 else 2000 + year, month, day)
         return parser.parse(date_str, dayfirst=True).date()  # Use dayfirst=True for European format (DD/MM/YYYY)
     except Exception:
         # If we can't parse it, default to today
@@ -132,21 +475,11 @@ async def get_current_date(function_name: str, tool_call_id: str, args: Dict, ll
     try:
         now = get_current_time()
         
-        # Format date in French style
-        weekday = now.strftime("%A").capitalize()
-        day = now.strftime("%d")
-        month = now.strftime("%B").capitalize()
-        year = now.strftime("%Y")
-        time = now.strftime("%H:%M")
-        
-        # Format: "Lundi 20 Janvier 2023"
-        formatted_date = f"{weekday} {day} {month} {year}"
-        
         await result_callback({
-            "current_date": now.strftime("%d/%m/%Y"),  # DD/MM/YYYY format
-            "formatted_date": formatted_date,
-            "current_day": weekday,
-            "current_time": time,
+            "current_date": f"{now.day:02d}/{now.month:02d}/{now.year}",  # DD/MM/YYYY format
+            "formatted_date": format_french_date(now),  # Format: "Lundi 20 janvier 2023"
+            "current_day": _FR_DAYS[now.weekday()],
+            "current_time": f"{now.hour:02d}:{now.minute:02d}",
             "timezone": TIMEZONE,
             "is_weekday": now.weekday() < 5
         })
@@ -170,17 +503,18 @@ async def check_availability(function_name: str, tool_call_id: str, args: Dict,
         # Parse the date from arguments
         date_str = args.get('date')
         if not date_str:
-            await result_callback({"available_slots": [], "error": "Aucune date fournie"})
+            await result_callback({"available_ranges": [], "error": "Aucune date fournie"})
             return
 
         # Parse date, handling relative references
-        date = parse_relative_date(date_str)
+        today = get_current_time().date()
+        date = parse_relative_date(date_str, today=today)
         
         # If the parsed date is a weekend, inform the user
         if date.weekday() >= 5:  # Saturday or Sunday
             await llm.push_frame(TTSSpeakFrame(
                 f"Je suis désolé, mais notre clinique est fermée le week-end. "
-                f"La date que vous avez mentionnée, {date.strftime('%A %d %B').capitalize()}, tombe un week-end. "
+                f"La date que vous avez mentionnée, {format_french_date(date, with_year=False)}, tombe un week-end. "
                 "Souhaitez-vous vérifier la disponibilité pour le lundi suivant à la place ?"
             ))
             
@@ -188,63 +522,31 @@ async def check_availability(function_name: str, tool_call_id: str, args: Dict,
             while date.weekday() >= 5:
                 date += datetime.timedelta(days=1)
                 
-            date_str = date.strftime("%d/%m/%Y")  # Format as DD/MM/YYYY
+            date_str = f"{date.day:02d}/{date.month:02d}/{date.year}"  # Format as DD/MM/YYYY
             
         # Get calendar service
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
         # Get the doctor's calendar ID (using primary calendar for now)
         calendar_id = 'primary'
         
-        # Set time boundaries for the specified date
-        time_min = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        time_max = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        
         # Get events from the calendar
-        events_result = service.events().list(
-            calendarId=calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        # Define working hours (9 AM to 5 PM)
-        working_hours_start = 9  # 9h
-        working_hours_end = 17   # 17h
-        slot_duration = 30       # 30 minutes per slot
-        
-        # Generate all possible slots
-        all_slots = []
-        for hour in range(working_hours_start, working_hours_end):
-            for minute in [0, 30]:
-                slot_time = f"{hour:02d}h{minute:02d}" if minute > 0 else f"{hour:02d}h"
-                all_slots.append(slot_time)
+        events = await _list_day_events(service, calendar_id, date)
         
         # Mark booked slots
-        booked_slots = []
-        for event in events:
-            start = event['start'].get('dateTime')
-            if start:
-                start_time = datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
-                # Convert to Paris time
-                start_time = start_time.astimezone(TIMEZONE_PYTZ)
-                slot = f"{start_time.hour:02d}h{start_time.minute:02d}" if start_time.minute > 0 else f"{start_time.hour:02d}h"
-                booked_slots.append(slot)
+        booked_slots = {slot for slot in map(_event_slot, events) if slot}
         
         # Find available slots
-        available_slots = [slot for slot in all_slots if slot not in booked_slots]
+        available_slots = [slot for slot in _ALL_SLOTS if slot not in booked_slots]
         
         # Format the date nicely for display in French
-        formatted_date = date.strftime("%A %d %B %Y").capitalize()
+        formatted_date = format_french_date(date)
         
         await result_callback({
             "date": date_str,
             "formatted_date": formatted_date,
-            "available_slots": available_slots,
-            "is_today": date == get_current_time().date(),
+            "available_ranges": _merge_slots(available_slots),
+            "is_today": date == today,
             "is_weekday": date.weekday() < 5
         })
         
@@ -301,7 +603,7 @@ async def schedule_appointment(function_name: str, tool_call_id: str, args: Dict
         if date.weekday() >= 5:  # Saturday or Sunday
             await result_callback({
                 "success": False,
-                "error": f"Impossible de prendre rendez-vous le week-end. La date {date.strftime('%A %d %B').capitalize()} tombe un week-end."
+                "error": f"Impossible de prendre rendez-vous le week-end. La date {format_french_date(date, with_year=False)} tombe un week-end."
             })
             return
             
@@ -316,7 +618,7 @@ async def schedule_appointment(function_name: str, tool_call_id: str, args: Dict
         # Create start and end times (appointments are 30 minutes by default)
         start_time = datetime.datetime.combine(date, datetime.time(hour, minute))
         # Apply the Paris timezone
-        start_time = TIMEZONE_PYTZ.localize(start_time)
+        start_time = start_time.replace(tzinfo=TIMEZONE_INFO)
         end_time = start_time + datetime.timedelta(minutes=30)
         
         # Format times for Google Calendar API
@@ -324,7 +626,7 @@ async def schedule_appointment(function_name: str, tool_call_id: str, args: Dict
         end_time_str = end_time.isoformat()
         
         # Get calendar service
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
         # Create event
         event = {
@@ -341,18 +643,18 @@ async def schedule_appointment(function_name: str, tool_call_id: str, args: Dict
         }
         
         # Add the event to the calendar
-        event = service.events().insert(calendarId=calendar_id, body=event).execute()
+        event = await _execute(service.events().insert(calendarId=calendar_id, body=event, fields='id'))
+        _invalidate_day_events(calendar_id, date)
         
         # Format the date and time nicely for the result in French
-        formatted_date = date.strftime("%A %d %B %Y").capitalize()
-        formatted_time = f"{hour:02d}h{minute:02d}" if minute > 0 else f"{hour:02d}h"
+        formatted_date = format_french_date(date)
+        formatted_time = _slot_label(hour, minute)
         
         # Obtenir le nom du calendrier utilisé
         calendar_name = "Principal"
         if calendar_id != 'primary':
             try:
-                calendar_info = service.calendars().get(calendarId=calendar_id).execute()
-                calendar_name = calendar_info.get('summary', 'Spécialiste')
+                calendar_name = await _get_calendar_name(service, calendar_id, 'Spécialiste')
             except:
                 pass
         
@@ -375,6 +677,30 @@ async def schedule_appointment(function_name: str, tool_call_id: str, args: Dict
             "error": str(e)
         })
 
+async def _delete_events(service: Any, calendar_id: str, event_ids: List[str]) -> Dict[str, str]:
+    """
+    Delete several events in a single batch HTTP request
+    
+    Args:
+        service: The Google Calendar service
+        calendar_id: The calendar holding the events
+        event_ids: The ids of the events to delete
+        
+    Returns:
+        Dict[str, str]: The error message of each event that could not be deleted, keyed by id
+    """
+    failed = {}
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            failed[request_id] = str(exception)
+
+    batch = service.new_batch_http_request(callback=on_response)
+    for event_id in event_ids:
+        batch.add(service.events().delete(calendarId=calendar_id, eventId=event_id), request_id=event_id)
+    await _execute(batch)
+    return failed
+
 async def cancel_appointment(function_name: str, tool_call_id: str, args: Dict, llm: Any, context: Any, result_callback: Any) -> None:
     """
     Cancel an existing appointment
@@ -390,10 +716,14 @@ async def cancel_appointment(function_name: str, tool_call_id: str, args: Dict,
     try:
         # Extract appointment details
         appointment_id = args.get('appointment_id')
+        appointment_ids = list(dict.fromkeys(args.get('appointment_ids') or []))
         patient_name = args.get('patient_name')
         date_str = args.get('date')
         
-        if not appointment_id and not (patient_name and date_str):
+        if appointment_id and appointment_id not in appointment_ids:
+            appointment_ids = [appointment_id, *appointment_ids]
+        
+        if not appointment_ids and not (patient_name and date_str):
             await result_callback({
                 "success": False,
                 "error": "Informations manquantes. Veuillez fournir soit l'identifiant du rendez-vous, soit le nom du patient et la date"
@@ -401,43 +731,47 @@ async def cancel_appointment(function_name: str, tool_call_id: str, args: Dict,
             return
         
         # Get calendar service
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
-        if appointment_id:
+        if len(appointment_ids) == 1:
             # Direct deletion by ID
-            service.events().delete(calendarId='primary', eventId=appointment_id).execute()
+            appointment_id = appointment_ids[0]
+            await _execute(service.events().delete(calendarId='primary', eventId=appointment_id))
+            # The day of the appointment is unknown here
+            _invalidate_day_events('primary')
             await result_callback({
                 "success": True,
                 "message": f"Le rendez-vous avec l'identifiant {appointment_id} a été annulé"
             })
+        elif appointment_ids:
+            # Several deletions by ID, sent together in a single batch request
+            failed = await _delete_events(service, 'primary', appointment_ids)
+            _invalidate_day_events('primary')
+            cancelled = [eid for eid in appointment_ids if eid not in failed]
+            await result_callback({
+                "success": not failed,
+                "cancelled_ids": cancelled,
+                "failed_ids": list(failed),
+                "message": f"{len(cancelled)} rendez-vous sur {len(appointment_ids)} ont été annulés"
+            })
         else:
             # Parse date, handling relative references
             date = parse_relative_date(date_str)
             
-            # Find appointment by patient name and date
-            time_min = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-            time_max = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-            
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
+            # Find appointment by patient name and date, in the calendar itself since it may have been changed by another call
+            events = await _list_day_events(service, 'primary', date, fresh=True)
             found = False
             
             for event in events:
                 if patient_name in event.get('summary', ''):
-                    service.events().delete(calendarId='primary', eventId=event['id']).execute()
+                    await _execute(service.events().delete(calendarId='primary', eventId=event['id']))
+                    _invalidate_day_events('primary', date)
                     found = True
                     break
             
             if found:
                 # Format the date nicely for the result in French
-                formatted_date = date.strftime("%A %d %B %Y").capitalize()
+                formatted_date = format_french_date(date)
                 
                 await result_callback({
                     "success": True,
@@ -469,11 +803,10 @@ async def list_calendars(function_name: str, tool_call_id: str, args: Dict, llm:
     """
     try:
         # Get calendar service
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
         # Récupère la liste des calendriers
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get('items', [])
+        calendars = await _load_calendar_list(service)
         
         # Prépare le résultat sous forme de liste structurée
         calendar_info = []
@@ -523,87 +856,135 @@ async def check_availability_for_calendar(function_name: str, tool_call_id: str,
         calendar_id = args.get('calendar_id', 'primary')
         
         if not date_str:
-            await result_callback({"available_slots": [], "error": "Aucune date fournie"})
+            await result_callback({"available_ranges": [], "error": "Aucune date fournie"})
             return
 
         # Parse date, handling relative references
-        date = parse_relative_date(date_str)
+        today = get_current_time().date()
+        date = parse_relative_date(date_str, today=today)
         
         # If the parsed date is a weekend, inform the user
         if date.weekday() >= 5:  # Saturday or Sunday
             await result_callback({
                 "date": date_str,
-                "formatted_date": date.strftime("%A %d %B %Y").capitalize(),
-                "available_slots": [],
-                "is_today": date == get_current_time().date(),
+                "formatted_date": format_french_date(date),
+                "available_ranges": [],
+                "is_today": date == today,
                 "is_weekday": False,
                 "error": "Cette date tombe un week-end. La clinique est fermée."
             })
             return
                 
         # Get calendar service
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
         # Try to get the calendar name
         calendar_name = "Calendrier principal"
         try:
-            calendar_info = service.calendars().get(calendarId=calendar_id).execute()
-            calendar_name = calendar_info.get('summary', 'Calendrier principal')
+            calendar_name = await _get_calendar_name(service, calendar_id, 'Calendrier principal')
         except Exception:
             # If we can't get the calendar details, continue with the default name
             pass
         
-        # Set time boundaries for the specified date
-        time_min = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        time_max = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        
         # Get events from the calendar
-        events_result = service.events().list(
-            calendarId=calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        # Define working hours (9 AM to 5 PM)
-        working_hours_start = 9  # 9h
-        working_hours_end = 17   # 17h
-        slot_duration = 30       # 30 minutes per slot
-        
-        # Generate all possible slots
-        all_slots = []
-        for hour in range(working_hours_start, working_hours_end):
-            for minute in [0, 30]:
-                slot_time = f"{hour:02d}h{minute:02d}" if minute > 0 else f"{hour:02d}h"
-                all_slots.append(slot_time)
+        events = await _list_day_events(service, calendar_id, date)
         
         # Mark booked slots
-        booked_slots = []
-        for event in events:
-            start = event['start'].get('dateTime')
-            if start:
-                start_time = datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
-                # Convert to Paris time
-                start_time = start_time.astimezone(TIMEZONE_PYTZ)
-                slot = f"{start_time.hour:02d}h{start_time.minute:02d}" if start_time.minute > 0 else f"{start_time.hour:02d}h"
-                booked_slots.append(slot)
+        booked_slots = {slot for slot in map(_event_slot, events) if slot}
         
         # Find available slots
-        available_slots = [slot for slot in all_slots if slot not in booked_slots]
+        available_slots = [slot for slot in _ALL_SLOTS if slot not in booked_slots]
         
         # Format the date nicely for display in French
-        formatted_date = date.strftime("%A %d %B %Y").capitalize()
+        formatted_date = format_french_date(date)
         
         await result_callback({
             "date": date_str,
             "formatted_date": formatted_date,
             "calendar_id": calendar_id,
             "calendar_name": calendar_name,
-            "available_slots": available_slots,
-            "is_today": date == get_current_time().date(),
+            "available_ranges": _merge_slots(available_slots),
+            "is_today": date == today,
+            "is_weekday": date.weekday() < 5
+        })
+        
+    except Exception as e:
+        await result_callback({"error": str(e)})
+
+async def check_availability_multi(function_name: str, tool_call_id: str, args: Dict, llm: Any, context: Any, result_callback: Any) -> None:
+    """
+    Vérifier en une seule fois la disponibilité de plusieurs calendriers à une date donnée
+    
+    Args:
+        function_name: The name of the function being called
+        tool_call_id: The ID of the tool call
+        args: Arguments containing date and calendar_ids to check availability
+        llm: The LLM service instance
+        context: The context object
+        result_callback: Callback to send results back to the LLM
+    """
+    try:
+        date_str = args.get('date')
+        calendar_ids = list(dict.fromkeys(args.get('calendar_ids') or []))
+        
+        if not date_str or not calendar_ids:
+            await result_callback({"available_ranges": [], "error": "Date ou calendriers manquants"})
+            return
+
+        # Parse date, handling relative references
+        today = get_current_time().date()
+        date = parse_relative_date(date_str, today=today)
+        
+        # If the parsed date is a weekend, inform the user
+        if date.weekday() >= 5:  # Saturday or Sunday
+            await result_callback({
+                "date": date_str,
+                "formatted_date": format_french_date(date),
+                "available_ranges": [],
+                "is_today": date == today,
+                "is_weekday": False,
+                "error": "Cette date tombe un week-end. La clinique est fermée."
+            })
+            return
+                
+        # Get calendar service
+        service = await _run(get_calendar_service)
+        
+        # One events query per calendar, all sent concurrently
+        results = await asyncio.gather(*(
+            _list_day_events(service, calendar_id, date) for calendar_id in calendar_ids
+        ), return_exceptions=True)
+        
+        calendars = []
+        free_somewhere = set()
+        for calendar_id, events in zip(calendar_ids, results):
+            if isinstance(events, Exception):
+                calendars.append({"calendar_id": calendar_id, "available_ranges": [], "error": str(events)})
+                continue
+            
+            # Mark booked slots
+            booked_slots = {slot for slot in map(_event_slot, events) if slot}
+            
+            available_slots = [slot for slot in _ALL_SLOTS if slot not in booked_slots]
+            free_somewhere.update(available_slots)
+            
+            try:
+                calendar_name = await _get_calendar_name(service, calendar_id, 'Calendrier principal')
+            except Exception:
+                calendar_name = calendar_id
+            calendars.append({
+                "calendar_id": calendar_id,
+                "calendar_name": calendar_name,
+                "available_ranges": _merge_slots(available_slots)
+            })
+        
+        await result_callback({
+            "date": date_str,
+            "formatted_date": format_french_date(date),
+            "calendars": calendars,
+            # Slots where at least one of the calendars is free
+            "available_ranges": _merge_slots(free_somewhere),
+            "is_today": date == today,
             "is_weekday": date.weekday() < 5
         })
         
@@ -628,36 +1009,36 @@ async def get_doctor_availability(function_name: str, tool_call_id: str, args: D
         date_str = args.get('date')
         
         if not doctor_name:
-            await result_callback({"available_slots": [], "error": "Nom du médecin manquant"})
+            await result_callback({"available_ranges": [], "error": "Nom du médecin manquant"})
             return
             
         if not date_str:
-            await result_callback({"available_slots": [], "error": "Date manquante"})
+            await result_callback({"available_ranges": [], "error": "Date manquante"})
             return
 
         await llm.push_frame(TTSSpeakFrame(f"Je vais chercher les disponiblités du docteur pour ce jour là, veuillez patienter un instant."))
         # Parse date, gestion des références relatives
-        date = parse_relative_date(date_str)
+        today = get_current_time().date()
+        date = parse_relative_date(date_str, today=today)
         
         # Vérifier si la date est un week-end
         if date.weekday() >= 5:  # Samedi ou Dimanche
             await result_callback({
                 "doctor_name": doctor_name,
                 "date": date_str,
-                "formatted_date": date.strftime("%A %d %B %Y").capitalize(),
-                "available_slots": [],
-                "is_today": date == get_current_time().date(),
+                "formatted_date": format_french_date(date),
+                "available_ranges": [],
+                "is_today": date == today,
                 "is_weekday": False,
-                "error": f"Le {date.strftime('%A %d %B').capitalize()} est un jour de week-end. Le cabinet est fermé."
+                "error": f"Le {format_french_date(date, with_year=False)} est un jour de week-end. Le cabinet est fermé."
             })
             return
                 
         # Obtenir le service de calendrier
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
         # Récupérer la liste des calendriers
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get('items', [])
+        calendars = await _load_calendar_list(service)
         
         # Chercher le calendrier du médecin
         doctor_calendar_id = None
@@ -680,52 +1061,24 @@ async def get_doctor_availability(function_name: str, tool_call_id: str, args: D
             await result_callback({
                 "doctor_name": doctor_name,
                 "date": date_str,
-                "formatted_date": date.strftime("%A %d %B %Y").capitalize(),
-                "available_slots": [],
-                "is_today": date == get_current_time().date(),
+                "formatted_date": format_french_date(date),
+                "available_ranges": [],
+                "is_today": date == today,
                 "is_weekday": date.weekday() < 5,
                 "error": f"Aucun calendrier trouvé pour le Dr {doctor_name}. Veuillez vérifier le nom ou contacter l'administrateur."
             })
             return
         
-        # Définir les limites de temps pour la date spécifiée
-        time_min = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        time_max = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        
         # Récupérer les événements du calendrier
-        events_result = service.events().list(
-            calendarId=doctor_calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        # Définir les heures de travail (9h à 17h par défaut)
-        working_hours_start = 9
-        working_hours_end = 17
-        slot_duration = 30  # 30 minutes par créneau
-        
-        # Générer tous les créneaux possibles
-        all_slots = []
-        for hour in range(working_hours_start, working_hours_end):
-            for minute in [0, 30]:
-                slot_time = f"{hour:02d}h{minute:02d}" if minute > 0 else f"{hour:02d}h"
-                all_slots.append(slot_time)
+        events = await _list_day_events(service, doctor_calendar_id, date)
         
         # Marquer les créneaux réservés
         booked_slots = []
         booked_slots_details = []
         
         for event in events:
-            start = event['start'].get('dateTime')
-            if start:
-                start_time = datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
-                # Convertir à l'heure de Paris
-                start_time = start_time.astimezone(TIMEZONE_PYTZ)
-                slot = f"{start_time.hour:02d}h{start_time.minute:02d}" if start_time.minute > 0 else f"{start_time.hour:02d}h"
+            slot = _event_slot(event)
+            if slot:
                 booked_slots.append(slot)
                 
                 # Ajouter les détails du rendez-vous (pour le débogage ou l'affichage détaillé)
@@ -736,10 +1089,11 @@ async def get_doctor_availability(function_name: str, tool_call_id: str, args: D
                 })
         
         # Trouver les créneaux disponibles
-        available_slots = [slot for slot in all_slots if slot not in booked_slots]
+        booked = set(booked_slots)
+        available_slots = [slot for slot in _ALL_SLOTS if slot not in booked]
         
         # Formater la date pour l'affichage en français
-        formatted_date = date.strftime("%A %d %B %Y").capitalize()
+        formatted_date = format_french_date(date)
         
         await result_callback({
             "doctor_name": doctor_name,
@@ -747,10 +1101,10 @@ async def get_doctor_availability(function_name: str, tool_call_id: str, args: D
             "doctor_calendar_name": doctor_calendar_name,
             "date": date_str,
             "formatted_date": formatted_date,
-            "available_slots": available_slots,
+            "available_ranges": _merge_slots(available_slots),
             "booked_slots": booked_slots,
             "total_available_slots": len(available_slots),
-            "is_today": date == get_current_time().date(),
+            "is_today": date == today,
             "is_weekday": date.weekday() < 5
         })
         
@@ -787,11 +1141,10 @@ async def schedule_appointment_with_doctor(function_name: str, tool_call_id: str
         await llm.push_frame(TTSSpeakFrame(f"Je vais planifier dans notre système la consultation comme convenu, veuillez patienter un instant."))
 
         # Obtenir le service de calendrier
-        service = get_calendar_service()
+        service = await _run(get_calendar_service)
         
         # Trouver le calendrier du médecin
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get('items', [])
+        calendars = await _load_calendar_list(service)
         
         doctor_calendar_id = None
         doctor_calendar_name = None
@@ -821,7 +1174,7 @@ async def schedule_appointment_with_doctor(function_name: str, tool_call_id: str
         if date.weekday() >= 5:  # Samedi ou Dimanche
             await result_callback({
                 "success": False,
-                "error": f"Impossible de prendre rendez-vous le week-end. La date {date.strftime('%A %d %B').capitalize()} tombe un week-end."
+                "error": f"Impossible de prendre rendez-vous le week-end. La date {format_french_date(date, with_year=False)} tombe un week-end."
             })
             return
         
@@ -850,46 +1203,29 @@ async def schedule_appointment_with_doctor(function_name: str, tool_call_id: str
             return
         
         # Vérifier si le créneau est disponible
-        slot_to_check = f"{hour:02d}h{minute:02d}" if minute > 0 else f"{hour:02d}h"
+        slot_to_check = _slot_label(hour, minute)
         
-        # Définir les limites de temps pour la date spécifiée
-        time_min = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        time_max = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=TIMEZONE_PYTZ).isoformat()
-        
-        # Récupérer les événements du calendrier
-        events_result = service.events().list(
-            calendarId=doctor_calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
+        # Récupérer les événements du calendrier, sans le cache : un autre appel a pu réserver ce créneau entre-temps
+        events = await _list_day_events(service, doctor_calendar_id, date, fresh=True)
         
         # Vérifier si le créneau est déjà réservé
         slot_already_booked = False
         for event in events:
-            start = event['start'].get('dateTime')
-            if start:
-                start_time = datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
-                start_time = start_time.astimezone(TIMEZONE_PYTZ)
-                event_slot = f"{start_time.hour:02d}h{start_time.minute:02d}" if start_time.minute > 0 else f"{start_time.hour:02d}h"
-                if event_slot == slot_to_check:
-                    slot_already_booked = True
-                    break
+            if _event_slot(event) == slot_to_check:
+                slot_already_booked = True
+                break
         
         if slot_already_booked:
             await result_callback({
                 "success": False,
-                "error": f"Le créneau {slot_to_check} le {date.strftime('%A %d %B').capitalize()} est déjà réservé. Veuillez choisir un autre horaire."
+                "error": f"Le créneau {slot_to_check} le {format_french_date(date, with_year=False)} est déjà réservé. Veuillez choisir un autre horaire."
             })
             return
             
         # Créer les heures de début et de fin (rendez-vous de 30 minutes par défaut)
         start_time = datetime.datetime.combine(date, datetime.time(hour, minute))
         # Appliquer le fuseau horaire de Paris
-        start_time = TIMEZONE_PYTZ.localize(start_time)
+        start_time = start_time.replace(tzinfo=TIMEZONE_INFO)
         end_time = start_time + datetime.timedelta(minutes=30)
         
         # Formater les heures pour l'API Google Calendar
@@ -911,11 +1247,12 @@ async def schedule_appointment_with_doctor(function_name: str, tool_call_id: str
         }
         
         # Ajouter l'événement au calendrier
-        event = service.events().insert(calendarId=doctor_calendar_id, body=event).execute()
+        event = await _execute(service.events().insert(calendarId=doctor_calendar_id, body=event, fields='id'))
+        _invalidate_day_events(doctor_calendar_id, date)
         
         # Formater la date et l'heure pour le résultat en français
-        formatted_date = date.strftime("%A %d %B %Y").capitalize()
-        formatted_time = f"{hour:02d}h{minute:02d}" if minute > 0 else f"{hour:02d}h"
+        formatted_date = format_french_date(date)
+        formatted_time = _slot_label(hour, minute)
         
         await result_callback({
             "success": True,
@@ -937,12 +1274,12 @@ async def schedule_appointment_with_doctor(function_name: str, tool_call_id: str
             "error": str(e)
         })
 
-def get_calendar_function_schemas() -> List[FunctionSchema]:
+def _build_calendar_function_schemas() -> Tuple[FunctionSchema, ...]:
     """
-    Return the function schemas for Google Calendar integration
+    Build the function schemas for Google Calendar integration
     
     Returns:
-        List of FunctionSchema objects for calendar operations
+        Tuple[FunctionSchema, ...]: Function schemas for calendar operations
     """
     get_current_date_schema = FunctionSchema(
         name="get_current_date",
@@ -979,6 +1316,23 @@ def get_calendar_function_schemas() -> List[FunctionSchema]:
         required=["date"],
     )
     
+    check_availability_multi_schema = FunctionSchema(
+        name="check_availability_multi",
+        description="Vérifier en une seule fois la disponibilité de plusieurs calendriers à une date donnée",
+        properties={
+            "date": {
+                "type": "string",
+                "description": "La date pour vérifier la disponibilité (format JJ/MM/AAAA, ou relative comme 'aujourd'hui', 'demain', 'lundi prochain', etc.)",
+            },
+            "calendar_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Les identifiants des calendriers à vérifier",
+            }
+        },
+        required=["date", "calendar_ids"],
+    )
+    
     get_doctor_availability_schema = FunctionSchema(
         name="get_doctor_availability",
         description="Rechercher les disponibilités d'un médecin spécifique pour une date donnée en consultant son sous-calendrier",
@@ -1059,6 +1413,11 @@ def get_calendar_function_schemas() -> List[FunctionSchema]:
                 "type": "string",
                 "description": "L'identifiant du rendez-vous à annuler",
             },
+            "appointment_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Les identifiants de plusieurs rendez-vous à annuler en une seule fois",
+            },
             "patient_name": {
                 "type": "string",
                 "description": "Le nom complet du patient dont le rendez-vous doit être annulé",
@@ -1078,16 +1437,57 @@ def get_calendar_function_schemas() -> List[FunctionSchema]:
         required=[],
     )
     
-    return [
+    # Only the registered functions are advertised: every schema is part of the prompt prefilled on each completion
+    return (
         get_current_date_schema,
-        check_availability_schema,
-        check_availability_for_calendar_schema,
+        #check_availability_schema,
+        #check_availability_for_calendar_schema,
+        check_availability_multi_schema,
         get_doctor_availability_schema,
-        schedule_appointment_schema,
+        #schedule_appointment_schema,
         schedule_appointment_with_doctor_schema,
         cancel_appointment_schema,
-        list_calendars_schema
-    ]
+        list_calendars_schema,
+    )
+
+# The schemas never change, they are built once at import
+_CALENDAR_FUNCTION_SCHEMAS = _build_calendar_function_schemas()
+
+def get_calendar_function_schemas() -> Tuple[FunctionSchema, ...]:
+    """
+    Return the function schemas for Google Calendar integration
+    
+    Returns:
+        Tuple[FunctionSchema, ...]: Function schemas for calendar operations, shared and immutable
+    """
+    return _CALENDAR_FUNCTION_SCHEMAS
+
+def _has_usable_credentials() -> bool:
+    """Check that saved credentials exist and are valid or refreshable, without any interactive login"""
+    try:
+        creds = _CREDS if _CREDS is not None else _load_credentials()
+    except Exception as e:
+        logger.warning("Unreadable Google Calendar token: {}", e)
+        return False
+    return bool(creds and (creds.valid or (creds.expired and creds.refresh_token)))
+
+async def prewarm_calendar() -> None:
+    """
+    Load the credentials, build the calendar service and fetch the calendar list ahead of
+    the first tool call, so the first appointment request does not pay for them
+    
+    Does nothing unless the saved token is valid or refreshable: the interactive login
+    (no token, or an expired one without refresh token) is left to the first call.
+    """
+    if not os.path.exists(TOKEN_FILE) and not os.path.exists(LEGACY_TOKEN_FILE):
+        return
+    try:
+        if not await _run(_has_usable_credentials):
+            return
+        service = await _run(get_calendar_service)
+        await _load_calendar_list(service)
+    except Exception as e:
+        logger.warning("Google Calendar warm-up failed: {}", e)
 
 def register_calendar_functions(llm_service: Any) -> None:
     """
@@ -1099,6 +1499,7 @@ def register_calendar_functions(llm_service: Any) -> None:
     llm_service.register_function("get_current_date", get_current_date)
     #llm_service.register_function("check_availability", check_availability)
     #llm_service.register_function("check_availability_for_calendar", check_availability_for_calendar)
+    llm_service.register_function("check_availability_multi", check_availability_multi)
     llm_service.register_function("get_doctor_availability", get_doctor_availability)
     #llm_service.register_function("schedule_appointment", schedule_appointment)
     llm_service.register_function("schedule_appointment_with_doctor", schedule_appointment_with_doctor)
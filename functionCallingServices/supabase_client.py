@@ -5,98 +5,250 @@
 #
 
 import os
-from typing import Dict, List, Optional
-from supabase import create_client, Client
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import orjson
 from dotenv import load_dotenv
 from loguru import logger
 
 # Load environment variables
 load_dotenv(override=True)
 
+# Columns used by the assistant, the only ones fetched from the clients table
+CLIENT_COLUMNS = "id,first_name,last_name,email,phone"
+
+# Postgres error returned by an ON CONFLICT on a column without unique constraint
+# (clients.email, see supabase/migrations)
+_NO_UNIQUE_CONSTRAINT = "42P10"
+
+def _quote(value: str) -> str:
+    """Quote a value for a PostgREST in.(...) filter, escaping backslashes and double quotes."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _rows(response: httpx.Response) -> List[Dict]:
+    """Check a PostgREST response and decode its JSON rows with orjson."""
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
 class SupabaseClient:
-    """Client for interacting with Supabase database."""
+    """Client for interacting with Supabase database through its PostgREST API."""
 
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
         self.key = os.getenv("SUPABASE_KEY")
-        
+
         if not self.url or not self.key:
             logger.error("Missing Supabase credentials in environment variables")
             raise ValueError("Supabase URL and key must be provided in environment variables")
-        
-        self.client = create_client(self.url, self.key)
+
+        # One pooled HTTP/2 client for every request, the TLS handshake is paid once per call
+        self.client = httpx.AsyncClient(
+            base_url=f"{self.url.rstrip('/')}/rest/v1",
+            headers={
+                "apikey": self.key,
+                "Authorization": f"Bearer {self.key}",
+                "Content-Type": "application/json",
+            },
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(10.0, connect=2.0),
+        )
         logger.info("Supabase client initialized")
 
-    async def get_clients(self) -> List[Dict]:
-        """Get all clients from the database."""
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.client.aclose()
+
+    async def warmup(self) -> None:
+        """Open the pooled connection (DNS, TCP, TLS) with an empty request before the first lookup."""
         try:
-            response = self.client.table("clients").select("*").execute()
-            return response.data
+            response = await self.client.head("/clients", params={"select": "id", "limit": 0})
+            response.raise_for_status()
         except Exception as e:
-            logger.error(f"Error getting clients: {e}")
+            logger.warning("Supabase warm-up failed: {}", e)
+
+    async def _select_one(self, column: str, value: str) -> Optional[Dict]:
+        """Get the first client whose column equals value."""
+        response = await self.client.get(
+            "/clients", params={"select": CLIENT_COLUMNS, column: f"eq.{value}", "limit": 1}
+        )
+        rows = _rows(response)
+        return rows[0] if rows else None
+
+    async def get_clients(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Get a page of clients from the database, ordered by id."""
+        try:
+            response = await self.client.get(
+                "/clients", params={"select": CLIENT_COLUMNS, "order": "id", "limit": limit, "offset": offset}
+            )
+            return _rows(response)
+        except Exception as e:
+            logger.error("Error getting clients: {}", e)
             return []
 
+    async def get_clients_page(self, limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Get a page of clients and the total number of clients in a single request."""
+        try:
+            response = await self.client.get(
+                "/clients",
+                params={"select": CLIENT_COLUMNS, "order": "id", "limit": limit, "offset": offset},
+                headers={"Prefer": "count=exact"},
+            )
+            rows = _rows(response)
+            # Content-Range: "0-49/123", or "*/0" when the page is empty
+            total = response.headers.get("content-range", "").rpartition("/")[2]
+            return rows, int(total) if total.isdigit() else offset + len(rows)
+        except Exception as e:
+            logger.error("Error getting clients page: {}", e)
+            return [], 0
+
     async def get_client_by_email(self, email: str) -> Optional[Dict]:
-        """Get a client by email address."""
+        """
+        Get a client by email address.
+
+        Returns None only if no client has this email, a failed request raises so it is
+        never mistaken for (and cached as) a missing client.
+        """
         try:
-            response = self.client.table("clients").select("*").eq("email", email).execute()
-            if response.data:
-                return response.data[0]
-            return None
+            return await self._select_one("email", email)
         except Exception as e:
-            logger.error(f"Error getting client by email: {e}")
-            return None
+            logger.error("Error getting client by email: {}", e)
+            raise
 
     async def get_client_by_phone(self, phone: str) -> Optional[Dict]:
-        """Get a client by phone number."""
+        """
+        Get a client by phone number.
+
+        Returns None only if no client has this phone number, a failed request raises.
+        """
         try:
-            response = self.client.table("clients").select("*").eq("phone", phone).execute()
-            if response.data:
-                return response.data[0]
-            return None
+            return await self._select_one("phone", phone)
         except Exception as e:
-            logger.error(f"Error getting client by phone: {e}")
-            return None
+            logger.error("Error getting client by phone: {}", e)
+            raise
 
-    async def add_client(self, first_name: str, last_name: str, email: str, phone: str) -> Dict:
-        """Add a new client to the database."""
+    async def insert_client(self, first_name: str, last_name: str, email: str, phone: str) -> Optional[Dict]:
+        """
+        Insert a new client in a single request.
+
+        Relies on the unique constraint on clients.email: an existing email is left untouched
+        and nothing is returned, so no lookup is needed before the insert.
+        Returns the created client, or None if a client with this email already exists.
+        """
         try:
-            # Check if client with this email already exists
-            existing = await self.get_client_by_email(email)
-            if existing:
-                logger.warning(f"Client with email {email} already exists")
-                return existing
-            
             client_data = {
                 "first_name": first_name,
                 "last_name": last_name,
                 "email": email,
                 "phone": phone
             }
-            
-            response = self.client.table("clients").insert(client_data).execute()
-            return response.data[0]
+
+            rows = await self._insert_rows([client_data])
+            return rows[0] if rows else None
+        except Exception as e:
+            logger.error("Error inserting client: {}", e)
+            raise
+
+    async def bulk_insert_clients(self, clients: List[Dict]) -> List[Dict]:
+        """
+        Insert several clients in a single request and a single transaction.
+
+        Clients whose email already exists are left untouched and are not returned.
+        Returns the created clients.
+        """
+        try:
+            return await self._insert_rows(clients)
+        except Exception as e:
+            logger.error("Error bulk inserting clients: {}", e)
+            raise
+
+    async def _insert_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Insert client rows, skipping existing emails, returns the created rows."""
+        response = await self.client.post(
+            "/clients",
+            params={"on_conflict": "email", "select": CLIENT_COLUMNS},
+            headers={"Prefer": "resolution=ignore-duplicates,return=representation"},
+            content=orjson.dumps(rows),
+        )
+        if response.status_code == 400 and orjson.loads(response.content).get("code") == _NO_UNIQUE_CONSTRAINT:
+            logger.warning("clients.email has no unique constraint, run supabase/migrations to save a request per insert")
+            return await self._insert_new_rows(rows)
+        return _rows(response)
+
+    async def _insert_new_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Insert the client rows whose email is not in the table yet, without relying on a unique constraint."""
+        emails = ",".join(_quote(row["email"]) for row in rows)
+        response = await self.client.get("/clients", params={"select": "email", "email": f"in.({emails})"})
+        existing = {row["email"] for row in _rows(response)}
+        # Also keep only the first row of each email within the batch, as ON CONFLICT DO NOTHING would
+        new_rows = []
+        for row in rows:
+            if row["email"] not in existing:
+                existing.add(row["email"])
+                new_rows.append(row)
+        if not new_rows:
+            return []
+        response = await self.client.post(
+            "/clients",
+            params={"select": CLIENT_COLUMNS},
+            headers={"Prefer": "return=representation"},
+            content=orjson.dumps(new_rows),
+        )
+        return _rows(response)
+
+    async def add_client(self, first_name: str, last_name: str, email: str, phone: str) -> Dict:
+        """Add a new client to the database, or return the existing client with this email."""
+        try:
+            client = await self.insert_client(first_name, last_name, email, phone)
+            if client:
+                return client
+
+            logger.warning("Client with email {} already exists", email)
+            return await self.get_client_by_email(email)
         except Exception as e:
-            logger.error(f"Error adding client: {e}")
+            logger.error("Error adding client: {}", e)
             raise
 
+    async def _update_where(self, column: str, value: str, data: Dict) -> Optional[Dict]:
+        """Update the clients whose column equals value, returns the first updated row."""
+        response = await self.client.patch(
+            "/clients",
+            params={column: f"eq.{value}", "select": CLIENT_COLUMNS},
+            headers={"Prefer": "return=representation"},
+            content=orjson.dumps(data),
+        )
+        rows = _rows(response)
+        return rows[0] if rows else None
+
     async def update_client(self, client_id: str, data: Dict) -> Dict:
         """Update a client's information."""
         try:
-            response = self.client.table("clients").update(data).eq("id", client_id).execute()
-            return response.data[0]
+            client = await self._update_where("id", client_id, data)
+            if client is None:
+                raise LookupError(f"No client with id {client_id}")
+            return client
+        except Exception as e:
+            logger.error("Error updating client: {}", e)
+            raise
+
+    async def update_client_by_email(self, email: str, data: Dict) -> Optional[Dict]:
+        """Update a client identified by email in a single request, returns None if not found."""
+        try:
+            return await self._update_where("email", email, data)
         except Exception as e:
-            logger.error(f"Error updating client: {e}")
+            logger.error("Error updating client by email: {}", e)
             raise
 
     async def delete_client(self, client_id: str) -> bool:
         """Delete a client from the database."""
         try:
-            self.client.table("clients").delete().eq("id", client_id).execute()
+            response = await self.client.delete("/clients", params={"id": f"eq.{client_id}"})
+            response.raise_for_status()
             return True
         except Exception as e:
-            logger.error(f"Error deleting client: {e}")
+            logger.error("Error deleting client: {}", e)
             return False
 
 # Create a singleton instance
-supabase = SupabaseClient() 
\ No newline at end of file
+supabase = SupabaseClient()
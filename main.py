@@ -7,88 +7,321 @@ Ce script configure un agent conversationnel pour la planification des rendez-vo
 import asyncio
 import os
 import sys
-import datetime
-import pytz
-import locale
-
-# Set French locale for date formatting
-try:
-    locale.setlocale(locale.LC_TIME, 'fr_FR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_TIME, 'fr_FR')
-    except:
-        pass  # Fallback to system locale if French is not available
+import tempfile
+from pathlib import Path
+from typing import IO, Optional, Tuple
 
 import aiohttp
+import httpx
 from dotenv import load_dotenv
 from loguru import logger
 from runner import configure
 
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
-from pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecat.frames.frames import TTSSpeakFrame
+from pipecat.frames.frames import EndFrame, StartInterruptionFrame, TTSSpeakFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
-from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
-from pipecat.services.cartesia import CartesiaTTSService
+from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.openai import OpenAILLMService
 from pipecat.transports.services.daily import DailyParams, DailyTransport
 
 from pipecat.services.deepgram import DeepgramSTTService, Language, LiveOptions
 from pipecat.services.elevenlabs import ElevenLabsTTSService
 
-from pipecat.services.gemini_multimodal_live.gemini import GeminiMultimodalLiveLLMService, InputParams
-from pipecat.services.google import GoogleLLMContext
-
 
 
 # Import our Google Calendar integration
 from functionCallingServices.google_calendar_integration import (
     get_calendar_function_schemas,
+    get_current_date_strings,
+    prewarm_calendar,
     register_calendar_functions,
-    get_current_time,
     TIMEZONE
 )
 
 # Import our Client Database integration
 from functionCallingServices.client_functions import (
+    FILLER_PHRASES,
     get_client_function_schemas,
     register_client_functions
 )
+from functionCallingServices.supabase_client import supabase
+
+# Import our pipeline processors
+from pipelineServices.llm_context import CachedToolsLLMContext
+from pipelineServices.llm_service import HTTP2OpenAILLMService
+from pipelineServices.metrics import PrometheusMetricsExporter, start_metrics_server
+from pipelineServices.prerendered_audio import phrase_audio_frame, preload_phrases
+from pipelineServices.processors import LatestAudioBuffer, LLMModelRouter, SentenceChunker
 
 load_dotenv(override=True)
 
 logger.remove(0)
-logger.add(sys.stderr, level="DEBUG")
+# enqueue: records are formatted and written by a background thread, never by the event loop
+logger.add(sys.stderr, level=os.getenv("LOG_LEVEL", "INFO"), enqueue=True)
 
 
-async def main():
-    async with aiohttp.ClientSession() as session:
-        (room_url, token) = await configure(session)
+# Static system prompt for the clinic assistant. It must stay byte-identical from one
+# call to the next so the LLM provider can serve it from its prompt cache.
+_SYSTEM_PROMPT = """
+Vous êtes le réceptionniste vocal de la clinique médicale de Paris. Vous parlez UNIQUEMENT EN FRANÇAIS et aidez les patients à prendre, annuler ou déplacer leurs rendez-vous par téléphone. Comportez-vous comme un réceptionniste humain: ne dites jamais que vous êtes une IA.
 
-        transport = DailyTransport(
-            room_url,
-            token,
-            "Assistant Clinique",
-            DailyParams(
-                audio_out_enabled=True,
-                audio_in_enabled=True
-            ),
+DÉROULEMENT D'UN APPEL (ordre strict, ne sautez aucune étape):
+0. Accueil: le message d'accueil est joué automatiquement au début de l'appel et figure déjà dans la conversation. Ne le répétez jamais et ne présentez pas les services avant que le patient ait exprimé son besoin.
+1. Besoin médical: demandez la raison de la consultation ("Cela m'aidera à vous orienter vers le médecin le plus adapté, et ces informations seront transmises au médecin."). Le motif servira de description du rendez-vous.
+2. Médecin: appelez list_calendars dès que le patient veut un rendez-vous. Chaque calendrier est un médecin, sa spécialité figure dans son nom. Proposez uniquement les un ou deux médecins réels les plus adaptés au besoin, jamais un médecin inventé. Ne donnez la liste complète, par spécialité, que si le patient la demande.
+3. Créneau: quand le patient a choisi un médecin et une période, appelez get_doctor_availability (doctor_name tel qu'il apparaît dans list_calendars, une seule journée et un seul médecin à la fois). Présentez des plages horaires, demandez l'heure souhaitée, puis confirmez: "Donc mardi à 14h30 avec le Dr Martin, c'est bien cela ?"
+4. Patient: seulement après avoir confirmé médecin et créneau, demandez "Est-ce la première fois que vous consultez chez nous ?". Ne supposez jamais la réponse. Patient connu: retrouvez son dossier par email ou téléphone (find_client_by_email, find_client_by_phone, verify_client) et vérifiez que ses coordonnées sont à jour (update_client). Nouveau patient: demandez son accord puis enregistrez prénom, nom, email et téléphone (add_client).
+5. Finalisation: une fois toutes les informations du patient confirmées, appelez schedule_appointment_with_doctor (time au format "14h30"), puis résumez le rendez-vous.
+Si le patient donne ses informations personnelles trop tôt, ramenez-le poliment au besoin médical et au créneau.
+
+COLLECTE DES INFORMATIONS PERSONNELLES:
+Demandez une seule information à la fois, répétez-la en l'épelant puis validez-la par une question fermée ("Est-ce bien correct ?") avant de passer à la suivante. Épelez les noms et prénoms lettre par lettre ("Jean J-E-A-N"), les emails avec leurs symboles ("jean point pascal A-ROBAS gmail point com") et dites les numéros de téléphone chiffre par chiffre. Les emails sont toujours en minuscules; le patient les dicte sous la forme "X arobas gmail.com". Si une information n'est pas claire, demandez au patient de l'épeler. Répétez toute correction. Prévenez le patient avant de rechercher ou de modifier ses informations, et demandez toujours ses coordonnées au patient avant d'appeler une fonction.
+
+RÈGLES DE LA CLINIQUE:
+- Ouverte du lundi au vendredi, de 9h à 17h. Fermée le week-end.
+- Les rendez-vous durent 30 minutes. En cas de symptôme inquiétant, proposez un rendez-vous rapproché, éventuellement avec plusieurs médecins.
+- Utilisez le format horaire français (14h30). En cas de conflit, proposez des créneaux proches.
+
+PRÉSENTATION DES DISPONIBILITÉS:
+Les fonctions renvoient des plages libres (available_ranges), où chaque demi-heure est réservable: "Le Dr Niel est disponible de 9h à 10h30, puis de 14h à 16h", jamais "à 9h, 9h30, 10h...". Si les plages sont très fragmentées, simplifiez ("quelques créneaux le matin entre 9h et 11h, et l'après-midi de 14h à 16h").
+
+STYLE:
+Vos réponses sont lues à voix haute: phrases courtes et simples, pas de listes ni de mise en forme, pas de jargon médical. Soyez chaleureux, patient et empathique, et adaptez-vous à votre interlocuteur. Si vous ne comprenez pas, demandez de reformuler. Rassurez sur la confidentialité et n'entrez pas dans les détails médicaux sensibles. N'utilisez jamais les mots "client", "calendrier", "base de données" ou "API": dites "vos informations ont bien été enregistrées", "nos médecins", "je ne trouve pas de dossier correspondant". Terminez l'appel en résumant le rendez-vous ou en confirmant qu'aucun rendez-vous n'a été pris.
+
+"""
+
+# Dynamic part of the system prompt, sent as a second system message after the static prefix
+_DATE_CONTEXT_TEMPLATE = """
+INFORMATIONS SUR LA DATE ET L'HEURE ACTUELLES:
+- Date d'aujourd'hui: {current_date}
+- Heure actuelle: {current_time}
+- Fuseau horaire: {TIMEZONE} (fuseau horaire de Paris)
+"""
+
+
+# Tools schema with both calendar and client functions, the schemas are static so it is built once
+_TOOLS = ToolsSchema(standard_tools=[*get_calendar_function_schemas(), *get_client_function_schemas()])
+
+# Fixed welcome message played as soon as the caller joins
+_WELCOME_MESSAGE = "Bonjour, clinique médicale de Paris, à votre service. En quoi puis-je vous aider aujourd'hui ?"
+
+# Played instead of the welcome message when every call slot is taken, the call then ends
+_BUSY_MESSAGE = "Bonjour, clinique médicale de Paris. Toutes nos lignes sont occupées, merci de rappeler dans quelques minutes."
+
+# Admission control: at most this many calls (one process each) run at once, 0 for no limit.
+# Size it to the calls the LLM backend serves without queueing (e.g. vLLM --max-num-seqs)
+_MAX_CONCURRENT_CALLS = int(os.getenv("MAX_CONCURRENT_CALLS", "0"))
+_CALL_SLOTS_DIR = Path(tempfile.gettempdir()) / "assistant-clinique-slots"
+
+# ElevenLabs voice and output audio format shared by the live TTS and the pre-synthesized audio
+_TTS_VOICE_ID = "FvmvwvObRqIHojkEGh5N"
+_AUDIO_OUT_SAMPLE_RATE = 16000
+
+# LLM backend: OpenAI by default, or any OpenAI-compatible server (e.g. a local vLLM serving
+# a quantized model) when LLM_BASE_URL is set
+_LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+_LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+# Short confirmations go to this faster model, the same model when self-hosted unless configured
+_LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", _LLM_MODEL if _LLM_BASE_URL else "gpt-4o-mini")
+
+# Deepgram endpoint: the hosted API by default, or a self-hosted Deepgram deployment close to the bot
+_DEEPGRAM_URL = os.getenv("DEEPGRAM_URL", "")
+
+# Port of the Prometheus endpoint exporting the per-stage latencies. With one process per call,
+# PROMETHEUS_MULTIPROC_DIR lets every call record its metrics for a single shared endpoint instead
+_METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+_METRICS_ENABLED = bool(_METRICS_PORT or os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Directory where the pre-synthesized phrases are cached between calls
+_AUDIO_CACHE_DIR = Path(__file__).parent / "audio_cache"
+
+
+def _date_context() -> str:
+    """
+    Build the date and time system message, the formatted strings are cached per minute
+    """
+    current_date, current_time = get_current_date_strings()
+    return _DATE_CONTEXT_TEMPLATE.format(
+        current_date=current_date,
+        current_time=current_time,
+        TIMEZONE=TIMEZONE
+    )
+
+
+def _acquire_call_slot() -> Optional[IO]:
+    """
+    Take one of the _MAX_CONCURRENT_CALLS call slots shared by the bot processes
+
+    A slot is an exclusive lock on a file, released by the system when the process exits,
+    even if it crashes.
+
+    Returns:
+        Optional[IO]: The locked slot file, to keep open for the whole call, or None if every slot is taken
+    """
+    import fcntl
+
+    _CALL_SLOTS_DIR.mkdir(exist_ok=True)
+    for slot in range(_MAX_CONCURRENT_CALLS):
+        slot_file = open(_CALL_SLOTS_DIR / f"{slot}.lock", "w")
+        try:
+            fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return slot_file
+        except BlockingIOError:
+            slot_file.close()
+    return None
+
+
+def _build_tts() -> ElevenLabsTTSService:
+    """
+    Build the ElevenLabs TTS service, shared by normal and rejected calls
+    """
+    return ElevenLabsTTSService(
+        api_key=os.getenv("ELEVEN_LABS_API_KEY"),
+        voice_id=_TTS_VOICE_ID,
+        sample_rate=_AUDIO_OUT_SAMPLE_RATE,  # Matches the Daily output rate, no resampling needed
+        params=ElevenLabsTTSService.InputParams(
+            language=Language.FR,
+            stability=1,
+            similarity_boost=1,
+            speed=1,
+            # Trade a little text normalization for an earlier first audio chunk on the stream-input WebSocket
+            optimize_streaming_latency="3"
+        )
+    )
+
+
+async def _preload_phrases(
+    session: aiohttp.ClientSession,
+    tts: ElevenLabsTTSService,
+    phrases: Tuple[str, ...] = (_WELCOME_MESSAGE, _BUSY_MESSAGE, *FILLER_PHRASES)
+):
+    """
+    Synthesize the welcome message and the waiting messages once, so they skip the TTS round-trip
+    """
+    await preload_phrases(
+        session,
+        phrases,
+        api_key=os.getenv("ELEVEN_LABS_API_KEY"),
+        voice_id=_TTS_VOICE_ID,
+        sample_rate=_AUDIO_OUT_SAMPLE_RATE,
+        model=tts.model_name,
+        voice_settings={"stability": 1, "similarity_boost": 1, "speed": 1},
+        cache_dir=_AUDIO_CACHE_DIR
+    )
+
+
+async def _warm_up_openai(llm: OpenAILLMService, context: Optional[CachedToolsLLMContext] = None):
+    """
+    Open the OpenAI HTTP connection with a 1-token completion
+
+    Deepgram and ElevenLabs open their WebSockets when the pipeline starts, OpenAI only
+    connects on the first completion, so the first answer would pay the TLS handshake.
+    With the call's context, the completion also prefills the system prompt and the tools,
+    so the first answer reads them from the backend's prefix cache (and a local vLLM has
+    already captured its CUDA graphs).
+    """
+    if context:
+        prompt = {"messages": context.messages, "tools": context.tools}
+    else:
+        prompt = {"messages": [{"role": "user", "content": "Bonjour"}]}
+    try:
+        await llm._client.chat.completions.create(
+            model=llm.model_name,
+            max_tokens=1,
+            **prompt
         )
+    except Exception as e:
+        logger.warning(f"OpenAI warm-up failed: {e}")
+
+
+async def _reject_call(session: aiohttp.ClientSession, configure_task: asyncio.Task):
+    """
+    Play the busy message to the caller and end the call
+
+    Every call slot is taken: only the transport and the TTS are started, no STT, no LLM and
+    no warm-up request, so the rejected call adds no load to the backends of the calls in progress.
+    """
+    tts = _build_tts()
+    (room_url, token), _ = await asyncio.gather(configure_task, _preload_phrases(session, tts, (_BUSY_MESSAGE,)))
+
+    transport = DailyTransport(
+        room_url,
+        token,
+        "Assistant Clinique",
+        DailyParams(audio_out_enabled=True, audio_out_sample_rate=_AUDIO_OUT_SAMPLE_RATE),
+    )
+    task = PipelineTask(Pipeline([tts, transport.output()]))
+
+    @transport.event_handler("on_first_participant_joined")
+    async def on_first_participant_joined(transport, participant):
+        logger.warning("Every call slot is taken, rejecting the call")
+        busy_frame = phrase_audio_frame(_BUSY_MESSAGE)
+        if busy_frame:
+            await tts.push_frame(busy_frame)
+            await task.queue_frame(EndFrame())
+        else:
+            await task.queue_frames([TTSSpeakFrame(_BUSY_MESSAGE), EndFrame()])
+
+    await PipelineRunner().run(task)
+
+
+async def main():
+    # The slot is held for the whole call (file locks are POSIX only, no admission control on Windows)
+    admission_control = _MAX_CONCURRENT_CALLS > 0 and sys.platform != "win32"
+    call_slot = _acquire_call_slot() if admission_control else None
+    rejected = admission_control and call_slot is None
+    if _METRICS_PORT:
+        start_metrics_server(_METRICS_PORT)
+    # One keep-alive connection pool for every HTTP call made during the call
+    connector = aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=75)
+    # OpenAI requests share a single multiplexed HTTP/2 connection
+    http2_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        timeout=30
+    )
+    async with aiohttp.ClientSession(connector=connector) as session, http2_client:
+        # Request the Daily room token in the background while the services are built
+        configure_task = asyncio.create_task(configure(session))
+
+        if rejected:
+            # Saturated: answer with the busy message rather than slowing down the calls in progress
+            await _reject_call(session, configure_task)
+            return
 
         # Configure service
         stt = DeepgramSTTService(
             api_key=os.getenv("DEEPGRAM_API_KEY"),
+            url=_DEEPGRAM_URL,
             live_options=LiveOptions(
                 model="nova-2-general",
                 language=Language.FR,
-                smart_format=True,
-                vad_events=True
+                smart_format=False,
+                punctuate=True,
+                interim_results=True,
+                vad_events=True,
+                endpointing=200,  # ms of silence before a transcript is final, interim results cover the wait
+                utterance_end_ms=1000,
+                no_delay=True
             )
         )
+
+        # Barge-in: interrupt the bot as soon as Deepgram hears the caller,
+        # without waiting for the final transcript
+        @stt.event_handler("on_speech_started")
+        async def on_speech_started(stt, *args, **kwargs):
+            await stt.push_frame(StartInterruptionFrame(), FrameDirection.DOWNSTREAM)
+
+        # Ask Deepgram to finalize the pending transcript as soon as the utterance ends
+        @stt.event_handler("on_utterance_end")
+        async def on_utterance_end(stt, *args, **kwargs):
+            await stt._connection.finalize()
+
         '''
+        from pipecat.services.cartesia import CartesiaTTSService
+
         tts = CartesiaTTSService(
             api_key=os.getenv("CARTESIA_API_KEY"),
             voice_id="5c3c89e5-535f-43ef-b14d-f8ffe148c1f0",
@@ -104,302 +337,12 @@ async def main():
 
         
                 # Configure service
-        tts = ElevenLabsTTSService(
-            api_key=os.getenv("ELEVEN_LABS_API_KEY"),
-            voice_id="FvmvwvObRqIHojkEGh5N",
-            sample_rate=24000,
-            params=ElevenLabsTTSService.InputParams(
-                language=Language.FR,
-                stability=1,
-                similarity_boost=1,
-                speed=1
-
-            )
-        )
+        tts = _build_tts()
 
 
-        # Get current date and time info for system prompt
-        now = get_current_time()
-        current_date = now.strftime("%A %d %B %Y").capitalize()
-        current_time = now.strftime("%H:%M")
-        
-        # Define system prompt for the clinic assistant
-        system_prompt = f"""
-        Vous êtes un assistant IA vocal spécialisé parlant UNIQUEMENT EN FRANÇAIS qui aide les patients à planifier leurs rendez-vous médicaux par téléphone.
-        
-        INFORMATIONS SUR LA DATE ET L'HEURE ACTUELLES:
-        - Date d'aujourd'hui: {current_date}
-        - Heure actuelle: {current_time}
-        - Fuseau horaire: {TIMEZONE} (fuseau horaire de Paris)        
-        
-        FLUX DE PRISE DE RENDEZ-VOUS:
-        Suivez STRICTEMENT cette séquence pour tout rendez-vous:
-
-        0. DÉMARRAGE DE L'APPEL (UNE SEULE FOIS UNIQUEMENT):
-          * Commencez TOUJOURS par une brève présentation: "Bonjour, clinique médicale de Paris !"
-          * Enchaînez immédiatement avec "En quoi puis-je vous aider aujourd'hui?" pour laisser rapidement la parole à l'utilisateur
-          * Ne donnez PAS de détails sur les services disponibles avant que l'utilisateur n'exprime son besoin
-        
-        1. COMPRENDRE LE BESOIN MÉDICAL
-           * Dialoguez d'abord pour comprendre précisément la raison de la consultation
-           * Posez des questions ouvertes: "Pourriez-vous me préciser pour quelles raisons vous aimeriez prendre rendez-vous ? Cela m'aidera à vous diriger vers le docteur le plus compétent et ces informations seront transmis au médecin avant consultation." 
-           * Si nécessaire, demandez des précisions sur les symptômes ou le type de consultation souhaité, ces informations seront utilisées comme description du rendez-vous sur google calendar plus tard.
-        
-        2. IDENTIFIER LE MÉDECIN APPROPRIÉ
-           * IMPÉRATIF: Appelez IMMÉDIATEMENT la fonction list_calendars pour obtenir la liste exacte des médecins disponibles
-           * Utilisez les résultats de cette fonction pour proposer UNIQUEMENT des médecins qui existent réellement
-           * Associez chaque médecin à sa spécialité, et proposez les plus pertinents pour le besoin exprimé
-           * Ne proposez JAMAIS un médecin sans avoir vérifié au préalable son existence via list_calendars
-           * Exemple: "Pour ce type de consultation, le Dr Martin ou la Dr Dubois seraient les plus adaptés. Avez-vous une préférence?"
-        
-        3. TROUVER UN CRÉNEAU DISPONIBLE
-           * Une fois le médecin choisi, UNIQUEMENT à ce moment, appelez la fonction check_calendar_availability avec:
-             - L'identifiant du calendrier du médecin choisi
-             - Une date précise demandée par le patient ou la date du jour pour voir les disponibilités immédiates
-           * N'appelez cette fonction que lorsque le patient a exprimé un intérêt pour une période spécifique
-           * Si le patient demande une journée spécifique, appelez la fonction pour trouver les disponiblités du docteur, indiquez la/les plages complètes: "Mardi, le Dr Martin est disponible de 9h à 11h puis de 11h30 à 16h"
-           * Une fois le jour choisi, demander "Quelle heure vous conviendrait?"
-           * Confirmez le créneau choisi: "Donc nous disons mardi à 14h30 avec le Dr Martin, c'est bien cela?"
-        
-        4. UNIQUEMENT APRÈS AVOIR FINALISÉ LES DÉTAILS DU RENDEZ-VOUS:
-           * DEMANDEZ SYSTÉMATIQUEMENT au patient: "Est-ce la première fois que vous consultez dans notre clinique?" ou "Avez-vous déjà consulté chez nous auparavant?"
-           * Si le patient indique qu'il a déjà consulté, recherchez ses coordonnées dans la base de données (par email ou téléphone) et vérifiez qu'elles sont à jour, toujours revérifier le numéro de téléphone/mail avec le patient avant de faire un appel de fonction
-           * Si c'est un nouveau patient, procédez à son enregistrement en suivant le protocole de gestion des informations (add_client)
-           * Ne supposez JAMAIS le statut du patient (nouveau ou existant) sans poser explicitement cette question
-           * Cette vérification doit être effectuée uniquement APRÈS avoir confirmé tous les détails du rendez-vous (médecin et créneau)
-           * IMPORTANT: Ne prononcez JAMAIS le mot "client" pour désigner la personne au téléphone. Adressez-vous toujours directement à elle.
-           * Ne dites JAMAIS "Le client a été ajouté à la base de données" mais plutôt "Vos informations ont été enregistrées avec succès" ou "Nous avons bien noté vos coordonnées"
-           * Si aucun dossier correspondant n'est trouvé, dites "Je ne trouve pas de patient correspondant à ce que vous m'avez indiqué" plutôt que "Aucun client trouvé"
-        
-        5. FINALISATION DU RENDEZ-VOUS
-           * UNIQUEMENT après avoir collecté et vérifié toutes les informations, confirmez la réservation définitive
-           * Résumez tous les détails: "Parfait. J'ai réservé votre rendez-vous avec le Dr Martin le jeudi 15 juin à 10h pour votre consultation concernant [motif]. Vous recevrez une confirmation par email/SMS"
-           * Résumez les informations du patient 
-        
-        IMPORTANT: Ne tentez JAMAIS d'enregistrer le patient avant d'avoir finalisé les détails du rendez-vous (médecin et créneau).
-        
-        CAPACITÉS PRINCIPALES:
-        1. Vérifier la disponibilité des médecins à des dates spécifiques
-        2. Planifier de nouveaux rendez-vous
-        3. Annuler ou reprogrammer des rendez-vous existants
-        4. Répondre aux questions générales sur la clinique
-        5. Consulter différents calendriers selon la spécialité médicale demandée
-        6. Gérer la base de données des patients patients (vérifier, ajouter, mettre à jour les informations)
-        7. Fournir des informations précises sur les médecins et spécialités disponibles (TOUJOURS vérifier dans les calendriers la liste réelle avant de répondre)
-        
-        RÈGLES POUR LA PRISE DE RENDEZ-VOUS:
-        - La clinique est ouverte du lundi au vendredi, de 9h à 17h. Lorsque le patient demande la disponilbité d'un médecin, appeler la fonction get doctor availibility
-        - Les rendez-vous standards durent 30 minutes
-        - Les rendez-vous d'urgence peuvent être programmés plus tôt si nécessaire
-        - IMPÉRATIF: Suivez l'ordre chronologique exact défini dans la section "FLUX DE PRISE DE RENDEZ-VOUS"
-        - Ne passez JAMAIS à l'étape de collecte des données personnelles avant d'avoir choisi le médecin et le créneau
-        - Ne finalisez le rendez-vous qu'après avoir vérifié toutes les informations du patient
-        - Si le patient essaie de donner ses informations personnelles trop tôt, guidez-le poliment: "Nous verrons ces détails juste après avoir trouvé un créneau qui vous convient. Pourriez-vous d'abord me préciser la raison de votre consultation?"
-        
-        GESTION DES PATIENTS:
-        - Vérifiez toujours si le patient existe déjà dans notre base de données en utilisant son email ou téléphone
-        - Pour les nouveaux patients, enregistrez leurs informations avec prénom, nom, email et téléphone
-        - Si des informations du patient doivent être mises à jour, utilisez la fonction appropriée pour les mettre à jour
-        - Vous pouvez rechercher des patients par email ou numéro de téléphone pour retrouver leurs informations
-        - IMPORTANT: Traitez TOUJOURS les adresses email en minuscules, quelle que soit la façon dont le patient les prononce. L'adresse mail sera donnée par le patient sous la forme X AROBAS gmail.com
-        
-        PROTOCOLE DE GESTION DES INFORMATIONS PATIENT:
-        - IMPÉRATIF: Pour toute action concernant les données des patients, collectez CHAQUE information SÉPARÉMENT
-        - TIMING CRUCIAL: Ne commencez à collecter les informations personnelles du patient qu'APRÈS avoir:
-          * Compris la raison de la consultation
-          * Identifié le médecin approprié
-          * Trouvé et confirmé un créneau disponible
-        - Introduisez la collecte d'informations avec une transition claire: "Maintenant que nous avons trouvé un créneau qui vous convient, j'aurais besoin de quelques informations pour finaliser votre rendez-vous."
-        - Suivez systématiquement ce processus en 4 étapes pour chaque donnée:
-          1. DEMANDEZ une seule information à la fois (nom, email, téléphone, etc.)
-          2. ÉCOUTEZ la réponse de l'utilisateur
-          3. RÉPÉTEZ l'information pour confirmation, en ÉPELANT OBLIGATOIREMENT les informations sensibles:
-             - Noms et prénoms: TOUJOURS épeler (ex: "Jean J-E-A-N Pascal P-A-S-C-A-L")
-             - Adresses email: TOUJOURS épeler et préciser les symboles (ex: "jean J-E-A-N . point pascal P-A-S-C-A-L A-ROBAS gmail.com") et TOUJOURS les traiter en minuscules
-             - Numéros de téléphone: TOUJOURS dire les chiffres un par un
-          4. VALIDEZ explicitement avec l'utilisateur ("Est-ce bien correct ?") avant de passer à l'information suivante
-        - Si l'information n'est pas claire, DEMANDEZ à l'utilisateur de l'épeler: "Pourriez-vous épeler votre nom, s'il vous plaît?"
-        - Informez toujours l'utilisateur AVANT de procéder à une recherche ou modification de ses informations personnelles
-        - En cas de nouveau patient, demandez explicitement son autorisation pour enregistrer ses coordonnées
-        - Exemple de dialogue type:
-          [L'utilisateur commence l'appel]
-          "Je voudrais prendre rendez-vous avec un médecin pour la semaine prochaine."
-          "Bien sûr. Pourriez-vous me préciser la raison de votre consultation, s'il vous plaît ?"
-          "J'ai des douleurs au dos depuis quelques jours."
-          [À ce moment, l'assistant doit appeler la fonction list_calendars pour obtenir la liste des médecins]
-          "Je comprends. Pour ce type de problème, nous avons deux spécialistes : le Dr Berger, rhumatologue, et le Dr Marc, médecin généraliste spécialisée en problèmes musculo-squelettiques. Avez-vous une préférence ?"
-          "Je préfère voir le Dr Berger."
-          "Pour quelle période souhaiteriez-vous prendre rendez-vous avec le Dr Berger ?"
-          "Si possible la semaine prochaine."
-          [À ce moment, l'assistant doit appeler la fonction get_doctor_availability avec le nom du Dr Berger et la date de la semaine prochaine]
-          "Parfait. Pour la semaine prochaine, le Dr Berger est disponible mardi de 13h à 16h et jeudi de 9h à 12h. Quelle journée vous conviendrait le mieux ?"
-          "Je préfère jeudi matin."
-          "Très bien. Pour jeudi matin, je vois que le Dr Berger est disponible de 9h à 12h. Y a-t-il un horaire qui vous conviendrait particulièrement dans cette plage ?"
-          "11h serait idéal pour moi."
-          "Très bien, je note un rendez-vous avec le Dr Berger jeudi à 11h pour des douleurs dorsales. Est-ce la première fois que vous consultez dans notre clinique ?"
-          "Oui, c'est la première fois."
-          "Dans ce cas, j'aurais besoin de quelques informations pour créer votre dossier. Pourriez-vous me donner votre nom complet ?"
-          "Je m'appelle Jean Pascal"
-          "Merci. Pour m'assurer que j'ai bien noté, votre nom est Jean J-E-A-N Pascal P-A-S-C-A-L, est-ce exact ?"
-          "Exact"
-          "Parfait. Pourrais-je avoir votre adresse email pour pouvoir vous envoyer la confirmation du rendez-vous ?"
-          "jean.pascal@gmail.com"
-          "J'ai bien noté jean point pascal A-ROBAS gmail point com. Est-ce bien cela ?"
-          "Oui c'est ça."
-          "Merci. Et votre numéro de téléphone ?"
-          "0612345678"
-          "J'ai noté le 06-12-34-56-78. Est-ce correct ?"
-          "Oui."
-          "Parfait. Souhaitez-vous que nous conservions ces informations pour faciliter vos prochains rendez-vous ?"
-          "Oui, ce serait plus simple."
-          [À ce moment, l'assistant doit appeler la fonction schedule_appointment_with_doctor avec le nom du Dr Berger, la date et l'heure choisies (jeudi à 11h), le nom complet du patient (Jean Pascal) et le motif de la consultation (douleurs dorsales)]
-          "Vos coordonnées sont maintenant enregistrées. J'ai donc finalisé votre rendez-vous avec le Dr Berger ce jeudi à 11h pour vos douleurs dorsales. Vous recevrez une confirmation par email. Y a-t-il autre chose que je puisse faire pour vous ?"
-        - Ne passez JAMAIS à l'étape suivante sans avoir obtenu confirmation explicite de l'information précédente
-        - Si l'utilisateur corrige une information, répétez-la à nouveau pour confirmation
-        
-        GESTION DES CALENDRIERS:
-        - La clinique possède plusieurs médecins et spécialistes, chacun avec son propre calendrier
-        - Chaque sous-calendrier correspond à un médecin spécifique de la clinique
-        - Vous pouvez utiliser get_doctor_availability pour vérifier les disponibilités par nom de médecin
-        - Vous pouvez utiliser schedule_appointment_with_doctor pour programmer un rendez-vous directement avec le médecin choisi
-        - En cas de besoin urgent, vous pouvez vérifier la disponibilité de plusieurs médecins
-        - Si le patient ne précise pas de préférence de médecin, proposez-lui le spécialiste le plus adapté à son besoin
-        - IMPORTANT: Pour toute discussion impliquant les médecins de la clinique:
-          * Appelez TOUJOURS d'abord la fonction list_calendars pour obtenir la liste exacte et à jour des médecins
-          * Ne vous fiez PAS à une liste prédéfinie ou mémorisée de médecins - utilisez UNIQUEMENT les résultats de list_calendars
-          * Chaque sous-calendrier correspond à un médecin de la clinique avec sa spécialité indiquée dans le nom du calendrier
-        - Lorsque vous consultez les disponibilités d'un médecin, regroupez les créneaux libres en PLAGES HORAIRES
-        - Par exemple, si des créneaux sont libres de 9h à 12h, présentez-les comme "disponible de 9h à 12h" plutôt que de lister chaque demi-heure
-        - IMPORTANT: Lorsqu'un patient demande des informations sur les médecins ou spécialistes disponibles:
-          * Consultez TOUJOURS les calendriers pour obtenir la liste réelle des médecins et leurs spécialités
-          * Ne JAMAIS inventer ou supposer les médecins disponibles sans vérification
-          * Ne JAMAIS mentionner le mot "calendrier" dans votre réponse à l'utilisateur
-          * Présentez les médecins par spécialité, en utilisant des formulations comme "Notre clinique compte plusieurs spécialistes..."
-          * Si un patient demande explicitement la liste des médecins, utilisez la fonction appropriée pour consulter les calendriers et répondre précisément
-        
-        INSTRUCTIONS DE COMMUNICATION:
-        - Soyez chaleureux et empathique - vous êtes la première interaction du patient avec la clinique
-        - Utilisez un langage simple et évitez le jargon médical
-        - Confirmez toujours les informations avec le patient avant de finaliser un rendez-vous
-        - Adaptez votre style de communication selon le profil du patient (adulte, personne âgée, parent appelant pour un enfant)
-        - Guidez patiemment l'appelant pour obtenir toutes les informations nécessaires sans paraître intrusif
-        - Si le patient mentionne un symptôme inquiétant, suggérez poliment un rendez-vous plus rapproché
-        - IMPÉRATIF: Procédez étape par étape dans la collecte d'informations, sans jamais sauter d'étape
-        - Répétez systématiquement chaque information importante fournie par le patient pour vous assurer de l'avoir bien comprise
-        - Épeler les noms, prénoms, et adresses email est obligatoire pour éviter toute erreur de saisie
-        - Validez toujours avec une question fermée (par exemple, "Est-ce correct ?") avant de passer à l'étape suivante
-        - Patience est cruciale : attendez la confirmation du patient avant de poursuivre
-        - Ne mentionnez JAMAIS explicitement "la base de données" ou des opérations techniques comme "j'ai ajouté/enregistré votre profil dans la base de données"
-        - Utilisez plutôt des expressions naturelles comme "Parfait, vos informations sont bien enregistrées" ou "Merci, nous avons bien noté vos coordonnées"
-        
-        PROTECTION DE LA VIE PRIVÉE:
-        - Ne demandez que les informations strictement nécessaires à la prise de rendez-vous
-        - Rassurez le patient sur la confidentialité des informations partagées
-        - N'entrez pas dans les détails médicaux sensibles inutilement
-        
-        GESTION DU TEMPS ET DES DATES:
-        - Convertissez intelligemment les références relatives au temps ("demain", "en fin de semaine", "lundi prochain")
-        - Gérez les heures au format français (14h30 et non 2:30 PM)
-        - Si un patient n'est pas précis sur l'heure, proposez des créneaux spécifiques
-        - En cas de conflit d'horaire, proposez des alternatives proches
-        
-        FORMAT DE CONVERSATION:
-        - Vos réponses seront converties en parole, donc:
-          * Évitez les listes à puces ou numérotées
-          * Utilisez des phrases courtes et claires
-          * Ne mentionnez pas d'éléments visuels ou de formatage
-          * Faites des pauses naturelles entre les différentes idées
-        
-        CONTEXTE TECHNIQUE:
-        - Vous fonctionnez avec l'API Google Calendar pour la gestion des rendez-vous
-        - Vous pouvez accéder à plusieurs calendriers selon les spécialités médicales
-        - Le système utilise le fuseau horaire de Paris pour tous les rendez-vous
-        - Vous avez accès à une base de données des patients via Supabase pour gérer les informations des patients
-        - NOTE IMPORTANTE: Les termes "calendrier", "API", "base de données" sont des termes techniques que vous ne devez JAMAIS utiliser avec les patients. Utilisez uniquement un langage naturel et convivial.
-        
-        UTILISATION DES FONCTIONS DE RECHERCHE DE CALENDRIERS:
-        1. RECHERCHE PROACTIVE DES MÉDECINS
-           * Au début de toute conversation concernant un rendez-vous, appelez SYSTÉMATIQUEMENT la fonction list_calendars pour connaître tous les médecins disponibles
-           * Cette recherche doit être faite DÈS QUE le patient exprime son besoin de prendre rendez-vous, AVANT même de proposer des médecins
-           * Utilisez ces informations pour proposer les médecins pertinents selon la spécialité demandée
-           * IMPORTANT: Ne présentez PAS la liste complète des médecins à l'utilisateur - faites une sélection intelligente selon le besoin exprimé
-           * Si l'utilisateur demande explicitement "Quels médecins sont disponibles dans votre clinique?", alors seulement présentez la liste complète, organisée par spécialité
-           * Exemple: Si le patient dit "Je voudrais prendre rendez-vous pour une douleur au dos", commencez par rechercher tous les médecins disponibles, puis proposez ceux spécialisés en rhumatologie ou médecine générale
-        
-        2. RECHERCHE DE DISPONIBILITÉS PAR MÉDECIN
-           * Utilisez EXCLUSIVEMENT la fonction get_doctor_availability pour vérifier les disponibilités d'un médecin spécifique
-           * Cette fonction est plus efficace car elle:
-             - Recherche automatiquement le calendrier associé au médecin par son nom
-             - Vérifie les créneaux disponibles spécifiquement pour ce médecin
-             - Retourne des informations détaillées sur les disponibilités
-           * Utilisez-la UNIQUEMENT APRÈS que le patient ait:
-             - Exprimé un besoin médical précis
-             - Choisi un médecin spécifique (ou accepté votre suggestion)
-             - Mentionné une préférence de période (jour, semaine, etc.)
-           * IMPORTANT: Avec le paramètre doctor_name, utilisez le nom complet du médecin tel qu'il apparaît dans list_calendars
-           * Exemple d'utilisation: get_doctor_availability(doctor_name="Dr David Niel", date="lundi prochain")
-           * Ne vérifiez PAS les disponibilités de tous les médecins simultanément
-           * Consultez les disponibilités pour une SEULE journée à la fois
-           * N'utilisez PLUS l'ancienne fonction check_availability_for_calendar qui nécessite de connaître l'ID du calendrier
-           * CRUCIAL - FORMAT DE PRÉSENTATION DES DISPONIBILITÉS:
-             - Une fois que vous avez les créneaux disponibles, vous DEVEZ les regrouper en plages horaires continues
-             - RÈGLE ABSOLUE: Ne présentez JAMAIS une liste de créneaux individuels (9h, 9h30, 10h...)
-             - Analysez les créneaux et identifiez les plages continues (ex: tous les créneaux de 9h à 11h sans interruption = "de 9h à 11h")
-             - Présentez au patient uniquement ces plages continues séparées par "puis" si multiples
-             - Exemples:
-               ✓ CORRECT: "Le Dr Niel est disponible de 9h à 10h30, puis de 14h à 16h"
-               ✗ INCORRECT: "Le Dr Niel est disponible à 9h, 9h30, 10h, 14h, 14h30, 15h, 15h30"
-             - Si la disponibilité est fragmentée avec beaucoup de petites plages, simplifiez pour le patient
-               (ex: "Le Dr Niel a quelques créneaux disponibles le matin entre 9h et 11h, et est plus largement disponible l'après-midi de 14h à 16h")
-             - L'objectif est de communiquer clairement les options sans surcharger le patient d'informations
-        
-        3. PRISE DE RENDEZ-VOUS DIRECTE
-           * Utilisez EXCLUSIVEMENT la fonction schedule_appointment_with_doctor pour créer un rendez-vous avec un médecin spécifique
-           * Cette fonction est plus efficace car elle:
-             - Trouve automatiquement le calendrier du médecin par son nom
-             - Vérifie que le créneau est bien disponible avant de créer le rendez-vous
-             - Gère toute la complexité technique à votre place
-           * Paramètres requis:
-             - patient_name: Nom complet du patient
-             - doctor_name: Nom du médecin (tel qu'il apparaît dans list_calendars)
-             - date: Date du rendez-vous (format JJ/MM/AAAA ou expression relative comme "demain", "lundi prochain")
-             - time: Heure du rendez-vous au format français (ex: "14h30" ou "14h")
-             - reason: Motif du rendez-vous (optionnel, mais recommandé)
-           * Exemple: schedule_appointment_with_doctor(patient_name="Jean Dupont", doctor_name="Dr David Niel", date="demain", time="15h30", reason="Douleurs lombaires")
-           * N'utilisez PLUS l'ancienne fonction schedule_appointment qui nécessite de connaître l'ID du calendrier
-        
-        4. SÉQUENCE D'APPELS DE FONCTIONS
-           * Ordre correct: list_calendars (tous les médecins) → get_doctor_availability (disponibilités d'un médecin spécifique) → schedule_appointment_with_doctor (création finale)
-           * Présentez TOUJOURS les résultats sous forme de plages horaires, pas de créneaux individuels
-           * N'utilisez JAMAIS la fonction de création de rendez-vous avant d'avoir confirmé toutes les informations du patient
-        
-        CONSIGNES IMPÉRATIVES:
-        - Vous devez vous exprimer UNIQUEMENT en français. N'utilisez JAMAIS l'anglais ou une autre langue.
-        - Ne mentionnez jamais que vous êtes une IA ou un programme informatique - comportez-vous comme un réceptionniste humain
-        - Si vous ne comprenez pas une demande, demandez poliment au patient de reformuler
-        - Terminez toujours l'appel en résumant les informations du rendez-vous ou en confirmant qu'aucun rendez-vous n'a été pris
-        - Pour TOUTE gestion des données patients (consultation, création, modification), vous DEVEZ suivre le protocole de gestion des informations patient en collectant et vérifiant chaque donnée SÉPARÉMENT
-        - Ne mentionnez JAMAIS l'existence d'une "base de données" ou de processus techniques - utilisez uniquement un langage naturel comme "nous avons bien noté vos informations" ou "vos coordonnées sont enregistrées"
-        - Suivez STRICTEMENT le protocole d'appel: brève présentation, question ouverte immédiate, identification du statut du patient dès qu'une requête est exprimée
-        - ÉPELER SYSTÉMATIQUEMENT toutes les informations sensibles lors de leur confirmation (noms, prénoms, emails, numéros de téléphone)
-        - Ne répétez JAMAIS le message d'accueil "Bonjour, clinique médicale..." car il est DÉJÀ envoyé automatiquement par le système
-        - Ne mentionnez JAMAIS le mot "calendrier" à l'utilisateur - utilisez plutôt des termes comme "nos médecins disponibles", "notre équipe médicale" ou "nos spécialistes"
-        - Lorsqu'un utilisateur demande des informations sur les médecins ou spécialités, vérifiez TOUJOURS dans les calendriers la liste réelle des médecins avant de répondre
-        - Respectez IMPÉRATIVEMENT l'ordre chronologique du FLUX DE PRISE DE RENDEZ-VOUS: d'abord comprendre le besoin, puis identifier le médecin approprié, trouver un créneau, et SEULEMENT ENSUITE collecter/vérifier les informations personnelles du patient
-        - REGROUPEMENT OBLIGATOIRE DES DISPONIBILITÉS: Lorsque vous recevez une liste de créneaux disponibles, vous DEVEZ les regrouper en plages horaires cohérentes avant de les présenter au patient, en suivant cet algorithme:
-          1. Identifiez les créneaux consécutifs (ex: si créneaux de 30 minutes, 9h, 9h30 et 10h forment une plage continue)
-          2. Créez une plage allant du premier au dernier créneau consécutif (ex: "de 9h à 10h" pour les créneaux 9h et 9h30)
-          3. Répétez pour chaque ensemble de créneaux consécutifs
-          4. Présentez le résultat sous forme "Le Dr X est disponible de [heure début] à [heure fin], puis de [heure début] à [heure fin]..."
-          5. N'utilisez JAMAIS de formulation comme "Le Dr X est disponible à 9h, 9h30, 10h..."
-        - Appelez SYSTÉMATIQUEMENT la fonction list_calendars au début de toute conversation sur les rendez-vous pour connaître les médecins réellement disponibles
-        - Utilisez EXCLUSIVEMENT la fonction get_doctor_availability pour vérifier les disponibilités d'un médecin et JAMAIS l'ancienne fonction check_availability_for_calendar
-        - Utilisez EXCLUSIVEMENT la fonction schedule_appointment_with_doctor pour prendre un rendez-vous et JAMAIS l'ancienne fonction schedule_appointment
-        - N'utilisez la fonction get_doctor_availability QUE lorsque le patient a exprimé une préférence pour un médecin spécifique ET une période particulière
-        - Ne proposez JAMAIS de médecins fictifs - basez-vous uniquement sur les résultats de la fonction list_calendars
-        """
-        
         '''
+        from pipecat.services.gemini_multimodal_live.gemini import GeminiMultimodalLiveLLMService, InputParams
+
         llm = GeminiMultimodalLiveLLMService(
             api_key=os.getenv("GEMINI_API_KEY"),
             #voice_id="Fenrir",    
@@ -409,11 +352,22 @@ async def main():
             params=InputParams(temperature=0.4, language=Language.FR) # Set model input params
         )
         '''
-        llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o",params=OpenAILLMService.InputParams(
-        temperature=0.4,
-        max_tokens=1000,
-        language=Language.FR
-    ))
+        # Spoken answers are a few short sentences: cap the length and stop on paragraph breaks.
+        # The cap also bounds tool calls, it leaves room for the largest one (bulk_add_clients with 5 patients)
+        llm = HTTP2OpenAILLMService(
+            http_client=http2_client,
+            # Self-hosted OpenAI-compatible servers usually accept any key
+            api_key=os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY") or "EMPTY",
+            base_url=_LLM_BASE_URL,
+            model=_LLM_MODEL,
+            params=OpenAILLMService.InputParams(
+                temperature=0.4,
+                max_tokens=400,
+                presence_penalty=0.1,
+                language=Language.FR,
+                extra={"stop": ["\n\n"]}
+            )
+        )
 
         # Register all calendar functions with the LLM service
         register_calendar_functions(llm)
@@ -421,35 +375,57 @@ async def main():
         # Register all client database functions with the LLM service
         register_client_functions(llm)
 
-        # Get calendar function schemas
-        calendar_functions = get_calendar_function_schemas()
-        
-        # Get client database function schemas
-        client_functions = get_client_function_schemas()
-        
-        # Create tools schema with both calendar and client functions
-        all_functions = calendar_functions + client_functions
-        tools = ToolsSchema(standard_tools=all_functions)
+        # Connection warm-ups (Supabase, Google Calendar service and calendar list) finish in the
+        # background, the bot joins the room without waiting for them
+        background_warmups = [asyncio.create_task(supabase.warmup()), asyncio.create_task(prewarm_calendar())]
+
+        # Date and time are kept out of the static system prompt so its prefix stays cacheable
+        date_message = {
+            "role": "system",
+            "content": _date_context(),
+        }
         messages = [
             {
                 "role": "system",
-                "content": system_prompt,
+                "content": _SYSTEM_PROMPT,
             },
+            date_message,
         ]
 
-        context = OpenAILLMContext(messages, tools)
+        context = CachedToolsLLMContext(messages, _TOOLS)
 
         context_aggregator = llm.create_context_aggregator(context)
 
+        # Prefill the prompt in the background: a cold or saturated LLM backend must not delay the room join
+        background_warmups.append(asyncio.create_task(_warm_up_openai(llm, context)))
+
+        # Wait for the Daily room token and the pre-synthesized phrases, fetched concurrently
+        (room_url, token), _ = await asyncio.gather(configure_task, _preload_phrases(session, tts))
+
+        transport = DailyTransport(
+            room_url,
+            token,
+            "Assistant Clinique",
+            DailyParams(
+                audio_out_enabled=True,
+                audio_out_sample_rate=_AUDIO_OUT_SAMPLE_RATE,
+                audio_in_enabled=True
+            ),
+        )
+
         pipeline = Pipeline(
             [
                 transport.input(),
+                LatestAudioBuffer(),  # Drops stale caller audio instead of queueing it if the STT falls behind
                 stt,
                 context_aggregator.user(),
+                LLMModelRouter(llm, fast_model=_LLM_FAST_MODEL),  # Short confirmations go to the faster model
                 llm,
+                SentenceChunker(),  # Flush LLM tokens to TTS sentence by sentence
                 tts,
                 transport.output(),
                 context_aggregator.assistant(),
+                *([PrometheusMetricsExporter()] if _METRICS_ENABLED else []),  # STT/LLM/TTS latency histograms
             ]
         )
 
@@ -459,27 +435,52 @@ async def main():
                 allow_interruptions=True,
                 enable_metrics=True,
                 enable_usage_metrics=True,
-                report_only_initial_ttfb=True,
+                report_only_initial_ttfb=False,  # Every turn, not only the first, to profile steady-state latency
             ),
         )
 
-        @transport.event_handler("on_first_participant_joined")
-        async def on_first_participant_joined(transport, participant):
-            await transport.capture_participant_transcription(participant["id"])
-            
-            '''
-            welcome_message = (
-                f"Bonjour, clinique médicale de Paris, à votre service. En quoi puis-je vous aider aujourd'hui ?"
-            )
-            
-            await llm.push_frame(TTSSpeakFrame(welcome_message))
-            '''
-            # Queue context frame to prepare for user response
-            await task.queue_frames([context_aggregator.user().get_context_frame()])
+        # Side tasks started during the call (warm-ups) belong to this group: the call waits
+        # for them on a normal exit and cancels them if the pipeline fails
+        async with asyncio.TaskGroup() as side_tasks:
 
-        runner = PipelineRunner()
-        await runner.run(task)
+            @transport.event_handler("on_first_participant_joined")
+            async def on_first_participant_joined(transport, participant):
+                # Play the fixed welcome message and record it as the assistant's first turn,
+                # the LLM then waits for the caller instead of generating its own greeting.
+                # It is queued first, so the transcription setup below overlaps with its playback
+                welcome_frame = phrase_audio_frame(_WELCOME_MESSAGE)
+                if welcome_frame:
+                    await tts.push_frame(welcome_frame)
+                else:
+                    # Hand the text straight to the TTS input queue, skipping the LLM and chunker hops
+                    await tts.queue_frame(TTSSpeakFrame(_WELCOME_MESSAGE), FrameDirection.DOWNSTREAM)
+                context.add_message({"role": "assistant", "content": _WELCOME_MESSAGE})
 
+                await transport.capture_participant_transcription(participant["id"])
+                # The bot may have waited in the room, give the LLM the time the call actually starts
+                date_message["content"] = _date_context()
+
+                # The bot may have waited a while in the room: reopen the OpenAI connection while the welcome message plays
+                side_tasks.create_task(_warm_up_openai(llm))
+
+            runner = PipelineRunner()
+            try:
+                await runner.run(task)
+            finally:
+                # Stop the warm-ups still running (the call failed early), then release the pooled Supabase connections
+                for warmup_task in background_warmups:
+                    warmup_task.cancel()
+                await asyncio.gather(*background_warmups, return_exceptions=True)
+                await supabase.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    # Use the libuv-based event loop when available, it is faster on socket-heavy workloads
+    # (uvloop does not support Windows)
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass  # Fallback to the default asyncio event loop
+
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""
+Contexte LLM pour l'assistant vocal
+Ce module fournit un contexte OpenAI qui évite de refaire à chaque tour le travail constant
+"""
+
+import os
+from typing import Any
+
+import orjson
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+# Pipecat builds its per-turn debug line eagerly (f-string), whatever the log level: below
+# DEBUG (see LOG_LEVEL in main.py) the whole conversation would be serialized for nothing
+_DEBUG_LOGGING = os.getenv("LOG_LEVEL", "INFO").upper() in ("TRACE", "DEBUG")
+
+
+class CachedToolsLLMContext(OpenAILLMContext):
+    """
+    OpenAILLMContext that converts its ToolsSchema to the provider format only once
+
+    The base context runs the LLM adapter conversion every time `tools` is read, that is on
+    every chat completion, although the function schemas never change during a call.
+    The messages dumped in the debug log on every completion are serialized with orjson,
+    and only when that log is actually written.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (standard tools, adapter, provider tools) of the last conversion
+        self._provider_tools_cache = None
+
+    @property
+    def tools(self) -> Any:
+        if not self._llm_adapter:
+            return self._tools
+
+        cache = self._provider_tools_cache
+        if cache and cache[0] is self._tools and cache[1] is self._llm_adapter:
+            return cache[2]
+
+        provider_tools = self._llm_adapter.from_standard_tools(self._tools)
+        self._provider_tools_cache = (self._tools, self._llm_adapter, provider_tools)
+        return provider_tools
+
+    def get_messages_for_logging(self) -> str:
+        """Serialize the messages for Pipecat's per-turn debug log with orjson instead of json."""
+        if not _DEBUG_LOGGING:
+            return f"{len(self.messages)} messages"
+        return orjson.dumps(self.messages, default=str).decode()
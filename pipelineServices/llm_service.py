@@ -0,0 +1,59 @@
+"""
+Service LLM pour l'assistant vocal
+Ce module fournit un service OpenAI qui envoie ses requêtes sur un client HTTP partagé
+"""
+
+from typing import AsyncIterator
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionChunk
+from pipecat.services.openai import OpenAILLMService
+
+
+async def _log_cached_tokens(stream: AsyncIterator[ChatCompletionChunk]) -> AsyncIterator[ChatCompletionChunk]:
+    """
+    Pass the completion chunks through, logging how many prompt tokens hit the prefix cache
+
+    OpenAI (and vLLM with --enable-prompt-tokens-details) report them in
+    usage.prompt_tokens_details.cached_tokens, DeepSeek-style servers in usage.prompt_cache_hit_tokens.
+    """
+    async for chunk in stream:
+        usage = getattr(chunk, "usage", None)
+        if usage:
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) if details else None
+            if cached is None:
+                cached = getattr(usage, "prompt_cache_hit_tokens", None)
+            logger.debug("LLM prompt tokens: {} ({} from the prefix cache)", usage.prompt_tokens, cached or 0)
+        yield chunk
+
+
+class HTTP2OpenAILLMService(OpenAILLMService):
+    """
+    OpenAILLMService whose OpenAI SDK client runs on a caller-provided httpx client
+
+    Built with `httpx.AsyncClient(http2=True)`, every completion of the call (tool-call
+    follow-ups included) is multiplexed on one HTTP/2 connection instead of opening a
+    new TCP/TLS connection whenever requests overlap. The prompt tokens served from the
+    backend's prefix cache are logged at DEBUG level for every completion.
+    """
+
+    def __init__(self, *, http_client: httpx.AsyncClient, **kwargs):
+        # The base constructor calls create_client(), the client must be set before
+        self._http_client = http_client
+        super().__init__(**kwargs)
+
+    def create_client(self, api_key=None, base_url=None, **kwargs):
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            organization=kwargs.get("organization"),
+            project=kwargs.get("project"),
+            default_headers=kwargs.get("default_headers"),
+            http_client=self._http_client,
+        )
+
+    async def get_chat_completions(self, *args, **kwargs):
+        return _log_cached_tokens(await super().get_chat_completions(*args, **kwargs))
@@ -0,0 +1,72 @@
+"""
+Métriques Prometheus pour l'assistant vocal
+Ce module fournit l'export des temps mesurés par Pipecat pour chaque étape du pipeline (STT, LLM, TTS)
+"""
+
+from loguru import logger
+from pipecat.frames.frames import Frame, MetricsFrame
+from pipecat.metrics.metrics import ProcessingMetricsData, TTFBMetricsData
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+try:
+    from prometheus_client import Histogram, start_http_server
+except ImportError:  # prometheus_client is optional, the metrics are then only logged by Pipecat
+    Histogram = start_http_server = None
+
+# Voice latencies: from a few tens of milliseconds (TTS first byte) to a few seconds (LLM with tools)
+_LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+if Histogram:
+    _TTFB_SECONDS = Histogram(
+        "voice_ttfb_seconds", "Time to first byte of a pipeline stage", ["processor"], buckets=_LATENCY_BUCKETS
+    )
+    _PROCESSING_SECONDS = Histogram(
+        "voice_processing_seconds", "Processing time of a pipeline stage", ["processor"], buckets=_LATENCY_BUCKETS
+    )
+
+
+def start_metrics_server(port: int) -> bool:
+    """
+    Serve the metrics on http://0.0.0.0:<port>/metrics
+
+    Args:
+        port: The port of the metrics endpoint
+
+    Returns:
+        bool: True if the endpoint is served, False if prometheus_client is missing or the port is taken
+    """
+    if not start_http_server:
+        logger.warning("prometheus_client is not installed, the pipeline metrics are not exported")
+        return False
+    try:
+        start_http_server(port)
+        return True
+    except OSError as e:
+        logger.warning("Metrics endpoint not started on port {}: {}", port, e)
+        return False
+
+
+class PrometheusMetricsExporter(FrameProcessor):
+    """
+    Enregistre dans des histogrammes Prometheus le TTFB et le temps de traitement de chaque étape
+
+    Les étapes sont identifiées par le nom de leur processeur sans son numéro
+    ("DeepgramSTTService", "HTTP2OpenAILLMService", "ElevenLabsTTSService").
+    À placer en fin de pipeline, là où arrivent les MetricsFrame de toutes les étapes,
+    avec `enable_metrics=True` dans les PipelineParams.
+    """
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, MetricsFrame) and Histogram:
+            for data in frame.data:
+                if isinstance(data, TTFBMetricsData):
+                    histogram = _TTFB_SECONDS
+                elif isinstance(data, ProcessingMetricsData):
+                    histogram = _PROCESSING_SECONDS
+                else:
+                    continue
+                histogram.labels(processor=data.processor.split("#")[0]).observe(data.value)
+
+        await self.push_frame(frame, direction)
@@ -0,0 +1,150 @@
+"""
+Audio pré-synthétisé pour l'assistant vocal
+Ce module synthétise une seule fois les phrases fixes afin de les jouer sans passer par le TTS en direct
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+from pipecat.frames.frames import OutputAudioRawFrame
+
+ELEVENLABS_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+
+# A stalled synthesis must not hold the call (aiohttp waits 300 s by default), the live TTS takes over
+SYNTHESIS_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+
+async def synthesize_pcm(
+    session: aiohttp.ClientSession,
+    text: str,
+    api_key: str,
+    voice_id: str,
+    sample_rate: int,
+    model: Optional[str] = None,
+    voice_settings: Optional[Dict] = None,
+) -> bytes:
+    """
+    Synthesize a sentence with the ElevenLabs REST API
+
+    Args:
+        session: The aiohttp session used for the request
+        text: The sentence to synthesize
+        api_key: The ElevenLabs API key
+        voice_id: The ElevenLabs voice to use
+        sample_rate: The sample rate of the returned audio
+        model: The ElevenLabs model, the API default is used if not provided
+        voice_settings: Optional voice settings (stability, similarity_boost, speed)
+
+    Returns:
+        bytes: Raw 16-bit mono PCM audio
+    """
+    payload = {"text": text, "language_code": "fr"}
+    if model:
+        payload["model_id"] = model
+    if voice_settings:
+        payload["voice_settings"] = voice_settings
+
+    async with session.post(
+        ELEVENLABS_TTS_URL.format(voice_id=voice_id),
+        params={"output_format": f"pcm_{sample_rate}"},
+        headers={"xi-api-key": api_key},
+        json=payload,
+        timeout=SYNTHESIS_TIMEOUT,
+    ) as response:
+        response.raise_for_status()
+        return await response.read()
+
+
+# (PCM audio, sample rate) of each pre-synthesized phrase, filled once per process
+_PHRASE_AUDIO: Dict[str, Tuple[bytes, int]] = {}
+
+
+def _cache_path(cache_dir: Path, text: str, voice_id: str, sample_rate: int, model: Optional[str]) -> Path:
+    """Return the file caching the audio of a phrase for a given voice and format."""
+    key = hashlib.sha256(f"{voice_id}|{model}|{sample_rate}|{text}".encode()).hexdigest()[:32]
+    return cache_dir / f"{key}.pcm"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write a cache file through a temporary file renamed into place
+
+    The cache is shared by every call process: the others never see a half-written file,
+    and a crash during the write leaves no truncated audio behind.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+async def preload_phrases(
+    session: aiohttp.ClientSession,
+    phrases: Iterable[str],
+    api_key: str,
+    voice_id: str,
+    sample_rate: int,
+    model: Optional[str] = None,
+    voice_settings: Optional[Dict] = None,
+    cache_dir: Optional[Path] = None,
+) -> None:
+    """
+    Synthesize fixed phrases once so they can be played without the live TTS
+
+    The audio is also written to `cache_dir`, so later processes (one per call) skip the
+    synthesis entirely. A phrase that fails to synthesize is simply spoken by the live TTS.
+
+    Args:
+        session: The aiohttp session used for the requests
+        phrases: The phrases to synthesize
+        api_key: The ElevenLabs API key
+        voice_id: The ElevenLabs voice to use
+        sample_rate: The sample rate of the audio
+        model: The ElevenLabs model, the API default is used if not provided
+        voice_settings: Optional voice settings (stability, similarity_boost, speed)
+        cache_dir: Optional directory where the audio is cached between processes
+    """
+    missing = []
+    for text in dict.fromkeys(phrases):
+        if text in _PHRASE_AUDIO:
+            continue
+        path = _cache_path(cache_dir, text, voice_id, sample_rate, model) if cache_dir else None
+        if path and path.is_file():
+            _PHRASE_AUDIO[text] = (path.read_bytes(), sample_rate)
+        else:
+            missing.append((text, path))
+
+    results = await asyncio.gather(
+        *(
+            synthesize_pcm(session, text, api_key, voice_id, sample_rate, model=model, voice_settings=voice_settings)
+            for text, _ in missing
+        ),
+        return_exceptions=True,
+    )
+    for (text, path), result in zip(missing, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Pre-synthesis failed for \"{text}\", falling back to live TTS: {result}")
+            continue
+        _PHRASE_AUDIO[text] = (result, sample_rate)
+        if path:
+            _write_atomic(path, result)
+
+
+def phrase_audio_frame(text: str) -> Optional[OutputAudioRawFrame]:
+    """Return the pre-synthesized audio of a phrase as a frame, or None if it was not preloaded."""
+    audio = _PHRASE_AUDIO.get(text)
+    if audio is None:
+        return None
+    pcm, sample_rate = audio
+    return OutputAudioRawFrame(audio=pcm, sample_rate=sample_rate, num_channels=1)
@@ -0,0 +1,210 @@
+"""
+Processeurs de frames Pipecat pour l'assistant vocal
+Ce module fournit des processeurs insérés dans le pipeline pour réduire la latence perçue par le patient
+"""
+
+import asyncio
+import re
+from collections import deque
+from typing import Deque, Optional
+
+from loguru import logger
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    Frame,
+    FunctionCallInProgressFrame,
+    InputAudioRawFrame,
+    LLMFullResponseEndFrame,
+    StartFrame,
+    StartInterruptionFrame,
+    TextFrame,
+)
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext, OpenAILLMContextFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.services.openai import OpenAILLMService
+
+# End of sentence: ".", "?", "!" or "…" optionally followed by a closing quote and whitespace
+# (\s also covers the non-breaking spaces of French typography, "d'accord\u00a0!")
+_SENTENCE_END_RE = re.compile(r"[.?!…](?:\s*[»\"])?\s*$")
+# End of clause: a comma or a semicolon optionally followed by whitespace
+_CLAUSE_END_RE = re.compile(r"[,;]\s*$")
+# Abbreviations that end with a dot but do not end a sentence ("le Dr. Martin")
+_ABBREVIATION_RE = re.compile(r"\b(?:Dr|Pr|M|Mme|Mlle)\.\s*$")
+# Words hinting that the caller's turn will need a function call (appointment, doctor, contact details).
+# No digit check: Deepgram runs without smart_format, numbers arrive as words
+_TOOL_HINT_RE = re.compile(
+    r"rendez|rdv|annul|d[ée]pla|report|disponib|docteur|m[ée]decin|\bdr\b|mail|arobas|t[ée]l[ée]phone|num[ée]ro",
+    re.IGNORECASE,
+)
+
+
+class SentenceChunker(FrameProcessor):
+    """
+    Regroupe les tokens produits par le LLM en phrases avant de les envoyer au TTS
+
+    Le TTS peut ainsi synthétiser la première phrase pendant que le LLM génère la suite.
+    Le tampon est vidé sur ".", "?", "!" ou "…", sur "," ou ";" après au moins `min_clause_words` mots,
+    ou dès qu'il dépasse `max_words` mots.
+    """
+
+    def __init__(self, min_clause_words: int = 4, max_words: int = 80, **kwargs):
+        super().__init__(**kwargs)
+        self._min_clause_words = min_clause_words
+        self._max_words = max_words
+        self._buf = ""
+
+    def _is_boundary(self) -> bool:
+        """Check whether the buffered text should be flushed to the TTS."""
+        if _SENTENCE_END_RE.search(self._buf) and not _ABBREVIATION_RE.search(self._buf):
+            return True
+        word_count = len(self._buf.split())
+        if _CLAUSE_END_RE.search(self._buf) and word_count >= self._min_clause_words:
+            return True
+        return word_count > self._max_words
+
+    async def _flush(self):
+        """Push the buffered text downstream and reset the buffer."""
+        if self._buf.strip():
+            await self.push_frame(TextFrame(self._buf))
+        self._buf = ""
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartInterruptionFrame):
+            # The caller barged in: drop whatever the LLM was saying
+            self._buf = ""
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, TextFrame) and direction == FrameDirection.DOWNSTREAM:
+            self._buf += frame.text
+            if self._is_boundary():
+                await self._flush()
+        elif isinstance(frame, (LLMFullResponseEndFrame, EndFrame)):
+            # End of the LLM response: send the trailing partial sentence
+            await self._flush()
+            await self.push_frame(frame, direction)
+        else:
+            await self.push_frame(frame, direction)
+
+
+class LLMModelRouter(FrameProcessor):
+    """
+    Choisit le modèle du LLM en fonction du dernier message du patient
+
+    Les réponses courtes sans lien avec un rendez-vous ("merci", "d'accord") sont envoyées au
+    modèle rapide, les autres au modèle par défaut du service LLM. Une réponse courte à une
+    question de l'assistant ("oui", "c'est bien ça") est une confirmation ou une information
+    qui peut déclencher un appel de fonction : elle reste sur le modèle par défaut, comme la
+    suite de tout appel de fonction (le contexte de relance ne repasse pas par ce processeur).
+    À placer entre l'agrégateur utilisateur et le LLM.
+    """
+
+    def __init__(self, llm: OpenAILLMService, fast_model: str, max_fast_words: int = 5, **kwargs):
+        super().__init__(**kwargs)
+        self._llm = llm
+        self._default_model = llm.model_name
+        self._fast_model = fast_model
+        self._max_fast_words = max_fast_words
+
+    def _select_model(self, context: OpenAILLMContext) -> str:
+        """Return the model to use for the last user message of the context."""
+        messages = context.messages
+        if len(messages) < 2 or messages[-1].get("role") != "user":
+            return self._default_model
+        content = messages[-1].get("content")
+        if (
+            not isinstance(content, str)
+            or len(content.split()) > self._max_fast_words
+            or _TOOL_HINT_RE.search(content)
+        ):
+            return self._default_model
+        # The caller answers the previous assistant turn: a question or a function call needs the default model
+        previous = messages[-2]
+        previous_content = previous.get("content")
+        if (
+            previous.get("role") != "assistant"
+            or previous.get("tool_calls")
+            or not isinstance(previous_content, str)
+            or "?" in previous_content
+        ):
+            return self._default_model
+        return self._fast_model
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OpenAILLMContextFrame):
+            self._llm.set_model_name(self._select_model(frame.context))
+        elif isinstance(frame, FunctionCallInProgressFrame):
+            # The LLM also sends it upstream: the follow-up completion with the function result,
+            # which skips this processor, runs on the default model
+            self._llm.set_model_name(self._default_model)
+
+        await self.push_frame(frame, direction)
+
+
+class LatestAudioBuffer(FrameProcessor):
+    """
+    Tampon borné entre l'entrée audio et le STT, qui jette l'audio le plus ancien en cas de retard
+
+    Si le STT ou la suite du pipeline prend du retard, au plus `max_audio_frames` frames audio
+    sont gardées en attente (25 frames de 20 ms = 0,5 s) : l'audio le plus ancien est abandonné
+    plutôt que de laisser la latence s'accumuler. Les autres frames (contrôle, VAD, ...) ne sont
+    jamais jetées et gardent leur ordre. À placer juste après `transport.input()`.
+    """
+
+    def __init__(self, max_audio_frames: int = 25, log_every: int = 50, **kwargs):
+        super().__init__(**kwargs)
+        self._max_audio_frames = max_audio_frames
+        self._log_every = log_every
+        self._frames: Deque[Frame] = deque()
+        self._audio_count = 0
+        self._dropped = 0
+        self._has_frames = asyncio.Event()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def _enqueue(self, frame: Frame):
+        """Queue a downstream frame, dropping the oldest queued audio frame if the buffer is full."""
+        if isinstance(frame, InputAudioRawFrame):
+            if self._audio_count >= self._max_audio_frames:
+                for i, queued in enumerate(self._frames):
+                    if isinstance(queued, InputAudioRawFrame):
+                        del self._frames[i]
+                        break
+                self._dropped += 1
+                if self._dropped % self._log_every == 1:
+                    logger.warning("{}: {} stale audio frames dropped so far", self, self._dropped)
+            else:
+                self._audio_count += 1
+        self._frames.append(frame)
+        self._has_frames.set()
+
+    async def _drain(self):
+        """Push the queued frames downstream in order, until the EndFrame."""
+        while True:
+            await self._has_frames.wait()
+            frame = self._frames.popleft()
+            if not self._frames:
+                self._has_frames.clear()
+            if isinstance(frame, InputAudioRawFrame):
+                self._audio_count -= 1
+            await self.push_frame(frame)
+            if isinstance(frame, EndFrame):
+                return
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartFrame):
+            await self.push_frame(frame, direction)
+            self._drain_task = self.create_task(self._drain())
+        elif isinstance(frame, CancelFrame):
+            if self._drain_task:
+                await self.cancel_task(self._drain_task)
+                self._drain_task = None
+            await self.push_frame(frame, direction)
+        elif direction == FrameDirection.DOWNSTREAM and self._drain_task:
+            self._enqueue(frame)
+        else:
+            await self.push_frame(frame, direction)
@@ -0,0 +1,7 @@
+-- Store contacts in the normalized form used by the lookups (eq.<value>): trimmed lower-case
+-- emails, phone numbers without separators (digits and leading +). Rows saved before the
+-- normalization would otherwise no longer be found, and be registered again.
+-- Runs before the unique email constraint: emails differing only by case become duplicates,
+-- which must be merged or removed before that migration.
+UPDATE clients SET email = lower(trim(email)) WHERE email <> lower(trim(email));
+UPDATE clients SET phone = regexp_replace(phone, '[^0-9+]', '', 'g') WHERE phone ~ '[^0-9+]';
@@ -0,0 +1,4 @@
+-- One patient per email address: add_client and bulk_add_clients insert with
+-- ON CONFLICT (email) DO NOTHING, which needs this constraint.
+-- Existing duplicates must be merged or removed before running it.
+ALTER TABLE clients ADD CONSTRAINT clients_email_key UNIQUE (email);